@@ -0,0 +1,19 @@
+"""基准测试脚本共用的计时工具"""
+
+from typing import Any, Callable
+import timeit
+
+
+def measure(func: Callable[[], Any], *, repeat: int = 5) -> float:
+    """返回单次调用的耗时，秒；取 ``repeat`` 轮中的最小值以减少干扰"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(label: str, seconds: float, baseline: float = 0.0) -> None:
+    """打印一行结果(单次耗时与每秒次数)，提供 ``baseline`` 时附带加速比"""
+    line = f"{label:<40} {seconds * 1e6:>10.2f} us {1 / seconds / 1000:>10.1f}k/s"
+    if baseline:
+        line += f"  ({baseline / seconds:.1f}x)"
+    print(line)
@@ -0,0 +1,110 @@
+"""
+`Message.deserialize` 的吞吐量
+
+分别测试 text、markdown、html 的短消息与长消息，
+并与旧实现(每次调用编译 @ 正则、逐段二次扫描表情)对比：
+
+    python benchmarks/bench_deserialize.py
+"""
+
+import re
+from typing import Optional
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu.message import Message, MessageSegment
+from nonebot.adapters.yunhu.models import (
+    Content,
+    HTMLContent,
+    MarkdownContent,
+    TextContent,
+)
+from nonebot.adapters.yunhu.tool import YUNHU_EMOJI_MAP
+
+_LEGACY_EMOJI_PATTERN = re.compile(
+    "|".join(re.escape(k) for k in sorted(YUNHU_EMOJI_MAP, key=len, reverse=True))
+)
+
+FACES = list(YUNHU_EMOJI_MAP)[:60]
+AT_LIST = ["u1", "u2"]
+SHORT = f"@张三\u200b 你好{FACES[0]}，@李四\u200b 明天见"
+LONG = "".join(
+    f"第{i}段文本，包含一些普通的中文内容用于测试。{face}" for i, face in enumerate(FACES)
+) + " @张三\u200b 结尾"
+CONTENT_TYPES = {
+    "text": TextContent,
+    "markdown": MarkdownContent,
+    "html": HTMLContent,
+}
+
+
+def legacy_deserialize(
+    content: Content, at_list: Optional[list[str]], message_type: str
+) -> Message:
+    """旧实现(text/markdown/html 部分)"""
+    msg = Message()
+    content.to_dict()
+    text = content.text  # type: ignore
+    with_face = message_type == "text"
+
+    def _split_face_segments(segment: str) -> list[MessageSegment]:
+        segments: list[MessageSegment] = []
+        last_end = 0
+        for match in _LEGACY_EMOJI_PATTERN.finditer(segment):
+            if match.start() > last_end:
+                segments.append(MessageSegment.text(segment[last_end : match.start()]))
+            emoji_code = match.group(0)
+            clean_code = emoji_code.lstrip("[").rstrip("]").lstrip(".")
+            if emoji_value := YUNHU_EMOJI_MAP.get(emoji_code):
+                segments.append(MessageSegment.face(clean_code, emoji_value))
+            last_end = match.end()
+        if last_end < len(segment):
+            segments.append(MessageSegment.text(segment[last_end:]))
+        return segments
+
+    at_pattern = re.compile(r"@(?P<name>[^@\u200b\s]+)\s*\u200b")
+    at_name_mapping = {}
+    at_index = 0
+    pos = 0
+    for embed in at_pattern.finditer(text):
+        if segment := text[pos : embed.start()]:
+            if with_face:
+                msg.extend(Message(_split_face_segments(segment)))
+            else:
+                msg.append(MessageSegment.text(segment))
+        user_name = embed.group("name")
+        if user_name in at_name_mapping:
+            actual_user_id = at_name_mapping[user_name]
+        else:
+            actual_user_id = ""
+            if at_list and at_index < len(at_list):
+                actual_user_id = at_list[at_index]
+                at_name_mapping[user_name] = actual_user_id
+                at_index += 1
+        if actual_user_id:
+            msg.append(MessageSegment.at(actual_user_id, user_name))
+        pos = embed.end()
+    if segment := text[pos:]:
+        if with_face:
+            msg.extend(Message(_split_face_segments(segment)))
+        else:
+            msg.append(MessageSegment.text(segment))
+    return msg
+
+
+def main() -> None:
+    for size, text in (("short", SHORT), ("long", LONG)):
+        for content_type, model in CONTENT_TYPES.items():
+            content = model(text=text, at=AT_LIST)
+            assert Message.deserialize(content, AT_LIST, content_type) == (
+                legacy_deserialize(content, AT_LIST, content_type)
+            )
+            old = measure(lambda: legacy_deserialize(content, AT_LIST, content_type))
+            new = measure(lambda: Message.deserialize(content, AT_LIST, content_type))
+            print(f"{size} {content_type} ({len(text)} chars)")
+            report("  legacy", old)
+            report("  single-pass tokenizer", new, old)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+长文本字符emoji编码的扫描开销
+
+对比按长度排序的字面量多选正则、不带预过滤的前缀树正则与 `encode_emoji`：
+
+    python benchmarks/bench_encode_emoji.py
+"""
+
+import re
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu.tool import (
+    _EMOJI_CODE_INDEX,
+    YUNHU_EMOJI_MAP,
+    build_trie_pattern,
+    encode_emoji,
+)
+
+_VS16 = "\ufe0f"
+_TAIL = "\ufe0f?(?![\u200d\u20e3\U0001f3fb-\U0001f3ff])"
+
+# 朴素实现：所有形式按长度降序拼成多选分支，每个位置逐个尝试
+_ALTERNATION = re.compile(
+    "(?:"
+    + "|".join(
+        re.escape(e)
+        for e in sorted(
+            {*YUNHU_EMOJI_MAP.values(), *_EMOJI_CODE_INDEX}, key=len, reverse=True
+        )
+    )
+    + ")"
+    + _TAIL
+)
+# 前缀树但没有前置字符类预过滤
+_TRIE = re.compile(
+    f"(?:{build_trie_pattern({*YUNHU_EMOJI_MAP.values(), *_EMOJI_CODE_INDEX})})"
+    + _TAIL
+)
+
+
+def _replace(match: re.Match[str]) -> str:
+    return f"[.{_EMOJI_CODE_INDEX[match[0].replace(_VS16, '')]}]\u200b"
+
+
+def alternation(text: str) -> str:
+    return _ALTERNATION.sub(_replace, text)
+
+
+def trie(text: str) -> str:
+    return _TRIE.sub(_replace, text)
+
+
+CJK = "今天天气不错，我们一起去公园散步吧。"
+EMOJI = [
+    "😮\u200d💨",
+    "🤦\u200d♂\ufe0f",
+    "👍",
+    "😂",
+    "✌\ufe0f",
+    "1\ufe0f\u20e3",
+    "🍉",
+    "🤔",
+]
+# 表中没有的长序列，只能原样保留
+UNKNOWN = ["👍🏽", "👨\u200d👩\u200d👧"]
+
+CASES = {
+    "10 KB ASCII": "hello world, " * 788,
+    "3380 CJK chars, no emoji": CJK * 188,
+    "CJK text with 200 emoji": "".join(
+        (CJK * 2)[: 22 + i % 5] + EMOJI[i % len(EMOJI)] for i in range(200)
+    ),
+}
+
+
+def check() -> None:
+    assert encode_emoji("😮\u200d💨") == "[.呼气]\u200b"
+    assert encode_emoji("🤦\u200d♂\ufe0f") == "[.头疼男]\u200b"
+    assert encode_emoji("✌") == encode_emoji("✌\ufe0f") == "[.胜利]\u200b"
+    for text in UNKNOWN:
+        assert encode_emoji(text) == text
+    for text in CASES.values():
+        assert alternation(text) == trie(text) == encode_emoji(text)
+
+
+def main() -> None:
+    check()
+    for label, text in CASES.items():
+        old = measure(lambda: alternation(text))
+        print(f"{label} (len={len(text)})")
+        report("  literal alternation", old)
+        report("  trie, no prefilter", measure(lambda: trie(text)), old)
+        report("  encode_emoji", measure(lambda: encode_emoji(text)), old)
+
+
+if __name__ == "__main__":
+    main()
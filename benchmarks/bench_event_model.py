@@ -0,0 +1,41 @@
+"""
+事件模型查找的单次开销
+
+对比每次遍历 `StringTrie` 前缀并反转列表(旧实现)与预先计算的查找表
+`Adapter.get_event_model`：
+
+    python benchmarks/bench_event_model.py
+"""
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu import Adapter
+
+EVENT_TYPES = (
+    "message.receive.normal.group",
+    "message.receive.instruction",
+    "group.join",
+    "bot.shortcut.menu",
+    "unknown.event.type",
+)
+
+
+def trie_walk(event_name: str) -> list:
+    """旧实现：每次遍历前缀树并反转新建的列表"""
+    return [model.value for model in Adapter.event_models.prefixes(f".{event_name}")][
+        ::-1
+    ]
+
+
+def main() -> None:
+    for event_name in EVENT_TYPES:
+        assert Adapter.get_event_model(event_name) == trie_walk(event_name)
+        old = measure(lambda: trie_walk(event_name))
+        new = measure(lambda: Adapter.get_event_model(event_name))
+        print(event_name)
+        report("  trie walk", old)
+        report("  dispatch table", new, old)
+
+
+if __name__ == "__main__":
+    main()
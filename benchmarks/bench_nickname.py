@@ -0,0 +1,50 @@
+"""
+昵称匹配的单条消息开销
+
+对比每条消息重新拼接并编译昵称正则(旧实现)与每个 Bot 缓存的前缀树正则：
+
+    python benchmarks/bench_nickname.py
+"""
+
+import re
+from types import SimpleNamespace
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu.bot import _get_nickname_pattern
+
+TEXT = "小助手 今天天气怎么样"
+
+
+def rebuild_per_message(nicknames: set[str], text: str) -> bool:
+    """旧实现：每条消息重新构建集合与正则"""
+    if names := set(filter(lambda n: n, nicknames)):
+        regex = "|".join(names)
+        return re.search(rf"^({regex})([\s,，]*|$)", text, re.IGNORECASE) is not None
+    return False
+
+
+def cached(bot: SimpleNamespace, text: str) -> bool:
+    pattern = _get_nickname_pattern(bot)  # type: ignore
+    return pattern is not None and pattern.match(text) is not None
+
+
+def main() -> None:
+    for size in (2, 50, 500, 5000):
+        # 真实昵称放在最后，旧实现需要尝试所有分支
+        nicknames = {f"nick{i}" for i in range(size - 1)} | {"小助手"}
+        bot = SimpleNamespace(
+            config=SimpleNamespace(nickname=nicknames),
+            _nickname_key=None,
+            _nickname_pattern=None,
+        )
+        assert rebuild_per_message(nicknames, TEXT) and cached(bot, TEXT)
+        old = measure(lambda: rebuild_per_message(nicknames, TEXT))
+        new = measure(lambda: cached(bot, TEXT))
+        print(f"{size} nicknames")
+        report("  rebuild per message", old)
+        report("  cached trie pattern", new, old)
+
+
+if __name__ == "__main__":
+    main()
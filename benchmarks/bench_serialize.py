@@ -0,0 +1,135 @@
+"""
+`Message.serialize` 的单次开销
+
+对比多次扫描消息的旧实现与单次遍历分类的实现，消息分别为单个文本段与 200 个消息段：
+
+    python benchmarks/bench_serialize.py
+"""
+
+from typing import Any, Optional
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu.message import (
+    At,
+    Face,
+    Html,
+    Image,
+    Markdown,
+    Message,
+    MessageSegment,
+    Text,
+)
+from nonebot.adapters.yunhu.tool import _EMOJI_BY_CODE
+
+FACE_CODE = next(iter(_EMOJI_BY_CODE))
+
+
+class LegacyMessage(Message):
+    """旧实现"""
+
+    def serialize(self) -> tuple[dict[str, Any], str]:  # type: ignore
+        if not self:
+            raise ValueError("Empty message")
+        result: dict[str, Any] = {"at": []}
+        if "audio" in self:
+            self.exclude("audio")
+        if "buttons" in self:
+            result["buttons"] = []
+            for seg in self["buttons"]:
+                result["buttons"].extend(seg.data["buttons"])
+        if all(isinstance(seg, (Text, At, Face)) for seg in self):
+            text_buffer: list[str] = []
+            last_text_type: Optional[str] = None
+            for seg in self:
+                if isinstance(seg, At):
+                    result["at"].append(seg.data["user_id"])
+                    text_buffer.append(f"@{seg.data['name']}\u200b")
+                elif isinstance(seg, Face):
+                    text_buffer.append(f"[.{seg.data['code']}]\u200b")
+                elif isinstance(seg, Text):
+                    text_buffer.append(seg.data["text"])
+                    last_text_type = seg.type
+            result["text"] = "".join(text_buffer)
+            return result, last_text_type or "text"
+        if len(self) > 1 and self.has("image"):
+            return self._legacy_markdown(result)
+        text_parts: list[str] = []
+        message_type: Optional[str] = None
+        for seg in self:
+            if isinstance(seg, At):
+                result["at"].append(seg.data["user_id"])
+                text_parts.append(seg.data["name"] + "\u200b")
+            elif isinstance(seg, (Markdown, Html)):
+                text_parts.append(seg.data["text"])
+                message_type = seg.type
+            else:
+                result.update(seg.data)
+                message_type = seg.type
+        result["text"] = "".join(text_parts)
+        return result, message_type or "text"
+
+    def _legacy_markdown(self, result: dict[str, Any]) -> tuple[dict[str, Any], str]:
+        md_parts: list[str] = []
+        for seg in self:
+            if isinstance(seg, At):
+                result["at"].append(seg.data["user_id"])
+                md_parts.append(f"@{seg.data['name'] or seg.data['user_id']}\u200b")
+            elif isinstance(seg, Face):
+                md_parts.append(seg.data["emoji"])
+            elif seg.is_text():
+                md_parts.append(seg.data["text"])
+            elif isinstance(seg, Image):
+                if image_url := seg.data["url"]:
+                    md_parts.append(f"![image]({image_url})\n")
+        result["text"] = "".join(md_parts).strip()
+        return result, "markdown"
+
+
+def text_at_face(count: int) -> list[MessageSegment]:
+    kinds = (
+        lambda i: MessageSegment.text(f"第{i}段文本 "),
+        lambda i: MessageSegment.at(f"user{i}", f"用户{i}"),
+        lambda i: MessageSegment.face(FACE_CODE, _EMOJI_BY_CODE[FACE_CODE]),
+    )
+    return [kinds[i % 3](i) for i in range(count)]
+
+
+def with_images(count: int) -> list[MessageSegment]:
+    return [
+        MessageSegment.image(url=f"https://example.com/{i}.png", imageKey=f"k{i}")
+        if i % 4 == 0
+        else MessageSegment.text(f"第{i}段文本 ")
+        for i in range(count)
+    ]
+
+
+def with_buttons(count: int) -> list[MessageSegment]:
+    button = {"text": "确定", "actionType": 3, "value": "ok"}
+    return text_at_face(count - 2) + [MessageSegment.buttons([[button]])] * 2  # type: ignore
+
+
+CASES = {
+    # 名称: (消息段, 新旧输出是否一致)
+    "1 text segment": ([MessageSegment.text("hello")], True),
+    "200 text/at/face segments": (text_at_face(200), True),
+    "200 segments with 50 images": (with_images(200), False),
+    "198 text/at/face + 2 buttons": (with_buttons(200), False),
+}
+
+
+def main() -> None:
+    for name, (segments, same_output) in CASES.items():
+        new_msg = Message(segments)
+        old_msg = LegacyMessage(segments)
+        if same_output:
+            assert new_msg.serialize() == old_msg.serialize()
+        old = measure(old_msg.serialize)
+        new = measure(new_msg.serialize)
+        print(name + ("" if same_output else " (legacy output differs)"))
+        report("  legacy", old)
+        report("  single pass", new, old)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+移除 @Bot 的开销
+
+合成的消息在 @Bot 与 @其他用户 之间交替插入文本，
+对比在循环中逐个 ``pop`` 的旧实现(平方复杂度)与单次遍历重建的 `_strip_at_me`：
+
+    python benchmarks/bench_strip_at.py
+"""
+
+from _timer import measure, report
+
+from nonebot.adapters.yunhu.bot import _strip_at_me
+from nonebot.adapters.yunhu.message import Message, MessageSegment
+
+BOT_ID = "bot"
+
+
+def build(mentions: int) -> list[MessageSegment]:
+    segments: list[MessageSegment] = []
+    for i in range(mentions):
+        segments.append(MessageSegment.text(f" 第{i}段 "))
+        user_id = BOT_ID if i % 2 == 0 else f"user{i}"
+        segments.append(MessageSegment.at(user_id, user_id))
+    segments.append(MessageSegment.text(" 结尾"))
+    return segments
+
+
+def legacy_strip(message: Message, self_id: str) -> None:
+    """旧实现：原地 pop，并修改相邻文本段"""
+    i = 0
+    while i < len(message):
+        seg = message[i]
+        if seg.type == "at" and seg.data.get("user_id") == self_id:
+            message.pop(i)
+            if i > 0 and message[i - 1].type == "text":
+                message[i - 1].data["text"] = message[i - 1].data["text"].rstrip()
+            if i < len(message) and message[i].type == "text":
+                message[i].data["text"] = message[i].data["text"].lstrip()
+        else:
+            i += 1
+
+
+def main() -> None:
+    for mentions in (100, 500, 2000, 8000):
+        legacy_segments = build(mentions)
+        segments = build(mentions)
+        legacy_result = Message(legacy_segments)
+        legacy_strip(legacy_result, BOT_ID)
+        stripped = _strip_at_me(Message(segments), BOT_ID)
+        assert stripped is not None
+        assert Message(stripped).extract_plain_text() == (
+            legacy_result.extract_plain_text()
+        )
+        # 两者都只复制列表，避免构造 Message 的开销掩盖差异；
+        # 旧实现会修改消息段，重复运行时文本已去除过空白，不影响计时
+        old = measure(lambda: legacy_strip(list(legacy_segments), BOT_ID))  # type: ignore
+        new = measure(lambda: _strip_at_me(list(segments), BOT_ID))  # type: ignore
+        print(f"{mentions} mentions ({len(segments)} segments)")
+        report("  pop in loop", old)
+        report("  single pass", new, old)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,13 @@
 import asyncio
 import inspect
-import json
-from typing import Any, Optional, cast
+from typing import Annotated, Any, Optional, Union, cast
 from typing_extensions import override
 
 from pygtrie import StringTrie
 
 from nonebot import get_plugin_config
 from nonebot.adapters import Adapter as BaseAdapter
-from nonebot.compat import type_validate_python
+from nonebot.compat import TypeAdapter, model_dump
 from nonebot.drivers import (
     URL,
     ASGIMixin,
@@ -21,8 +20,12 @@ from nonebot.drivers import (
 
 from . import event
 from .bot import Bot
+from .cache import TTLSet
+from .codec import JSONCodec, get_json_codec
 from .config import Config, YunHuConfig
-from .event import Event
+from .dispatcher import EventDispatcher
+from .event import Event, MessageEvent
+from .lazy import has_lazy_fields
 from .exception import (
     ApiNotAvailable,
     YunHuAdapterException,
@@ -31,6 +34,23 @@ from .exception import (
 )
 from nonebot.log import logger
 from .models import BotInfo
+from .recorder import WebhookRecorder
+from .validators import type_validate
+
+COALESCE_APIS = ("bot/messages", "user/homepage", "group/group-info")
+"""只读接口，相同参数的并发调用会合并为一次请求，网络错误时可安全重试"""
+
+
+def _get_event_type(json_data: dict[str, Any]) -> str:
+    """从原始数据计算事件分发键，即 `get_event_model` 使用的事件类型"""
+    header = json_data.get("header")
+    event_type = header.get("eventType", "") if isinstance(header, dict) else ""
+    detail = json_data.get("event")
+    if isinstance(detail, dict) and (message := detail.get("message")):
+        if message.get("contentType") == "tip":
+            return "group.tip"
+        return f"{event_type}.{message.get('chatType')}"
+    return event_type
 
 
 class Adapter(BaseAdapter):
@@ -44,13 +64,58 @@ class Adapter(BaseAdapter):
             continue
         event_models["." + model.__event__] = model
 
+    _event_model_table: dict[str, list[type[Event]]] = {}
+    """事件类型 -> `Event Model` 及 `FallBack Event Model` 列表，类创建时预先计算"""
+
+    for key in event_models.keys():
+        _event_model_table[key[1:]] = [
+            prefix.value for prefix in event_models.prefixes(key)
+        ][::-1]
+
+    _EVENT_MODEL_TABLE_LIMIT: int = 1024
+    """运行时记忆未知事件类型的上限，防止异常上报撑大表"""
+
+    _event_type_adapter: Optional[TypeAdapter[Event]] = None
+    """覆盖所有事件模型的可辨识联合校验器，pydantic < 2.5 时不可用"""
+
     @override
     def __init__(self, driver: Driver, **kwargs: Any):
         super().__init__(driver, **kwargs)
         """云湖适配器配置"""
         self.configs: Config = get_plugin_config(Config)
+        self.json_codec: JSONCodec = get_json_codec(self.configs.yunhu_json_backend)
+        """webhook 与 API 请求共用的 JSON 编解码器"""
         self.tasks: set["asyncio.Task"] = set()
+        """后台任务，关闭时取消"""
         self.bot_apps: dict[str, YunHuConfig] = {}
+        self.dispatchers: dict[str, EventDispatcher] = {}
+        """app_id -> 事件分发器"""
+        self.event_dedup: Optional[TTLSet[tuple[str, str]]] = (
+            TTLSet(
+                self.configs.yunhu_event_dedup_size,
+                self.configs.yunhu_event_dedup_ttl,
+            )
+            if self.configs.yunhu_event_dedup_size > 0
+            else None
+        )
+        """(app_id, eventId) 去重集合，过滤云湖重试导致的重复事件"""
+        self._closing: bool = False
+        """是否正在关闭，关闭期间 webhook 返回 503 让云湖重试"""
+        self._pending_calls: set[asyncio.Future] = set()
+        """进行中的 API 调用，关闭时等待其完成"""
+        self._inflight: dict[tuple[Any, ...], asyncio.Task] = {}
+        """进行中的只读 API 调用，相同的并发请求共享同一结果"""
+        self.coalesced: int = 0
+        """被合并到进行中请求的重复调用次数"""
+        self.retried: int = 0
+        """网络错误后重试的 API 调用次数"""
+        self.recorder: Optional[WebhookRecorder] = (
+            WebhookRecorder(self.configs.yunhu_record_path, self.json_codec)
+            if self.configs.yunhu_record_path
+            else None
+        )
+        """webhook 流量录制器"""
+        self._build_event_type_adapter()
         self.setup()
 
     @classmethod
@@ -60,30 +125,124 @@ class Adapter(BaseAdapter):
         return "YunHu"
 
     async def startup(self):
+        """
+        并发获取所有 Bot 的信息并连接
+
+        同时进行的请求数由 `yunhu_startup_concurrency` 限制，单个 Bot 超过
+        `yunhu_startup_timeout` 秒未完成即放弃，不影响其他 Bot。
+        在 `yunhu_bot_info_snapshot` 中有快照的 Bot 立即连接，最新信息在后台获取。
+        """
+        snapshot = self._load_bot_info_snapshot()
+        semaphore = asyncio.Semaphore(max(1, self.configs.yunhu_startup_concurrency))
+        bootstraps: dict[str, asyncio.Task[Optional[BotInfo]]] = {}
         for yhc in self.configs.yunhu_bots:
             if not yhc.app_id or not yhc.token:
                 continue
-            result = await self.get_bot_info(yhc)
-            if result.code != 1:
-                logger.error(
-                    f"<r><bg #f8bbd0>Failed to get Both {yhc.app_id} info. Response {result.msg}</bg #f8bbd0></r> "
-                )
-                continue
-            assert result.data
-            bot_info = result.data.bot
-
-            bot = Bot(
-                self,
-                bot_info.botId,
-                bot_config=yhc,
-                nickname=bot_info.nickname,
+            if (cached := snapshot.get(yhc.app_id)) is not None:
+                self._connect_bot(yhc, cached)
+            bootstraps[yhc.app_id] = asyncio.create_task(
+                self._bootstrap_bot(yhc, semaphore, snapshot.get(yhc.app_id))
             )
-            self.bot_apps[yhc.app_id] = yhc
-            self.bot_connect(bot)
-            logger.info(
-                f"Bot {bot_info.nickname} ({bot_info.botId}) connected",
+        # 没有快照的 Bot 需等待获取完成后才能连接
+        await asyncio.gather(
+            *(task for app_id, task in bootstraps.items() if app_id not in snapshot)
+        )
+        if self.configs.yunhu_bot_info_snapshot is not None and bootstraps:
+            task = asyncio.create_task(self._save_bot_info_snapshot(bootstraps))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _bootstrap_bot(
+        self,
+        yhc: YunHuConfig,
+        semaphore: asyncio.Semaphore,
+        cached: Optional[BotInfo],
+    ) -> Optional[BotInfo]:
+        """
+        获取 Bot 信息，没有快照时获取后连接，有快照时(已连接)只更新昵称
+
+        :return: 最新的 Bot 信息，获取失败时返回快照
+        """
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(
+                    self.get_bot_info(yhc), self.configs.yunhu_startup_timeout
+                )
+            except Exception as e:
+                logger.error(f"Failed to get Bot {yhc.app_id} info: {type(e)}, {e}")
+                return cached
+        if result.code != 1:
+            logger.error(
+                f"<r><bg #f8bbd0>Failed to get Both {yhc.app_id} info. Response {result.msg}</bg #f8bbd0></r> "
             )
-            logger.info(f"当前 Bot 使用人数: {bot_info.headcount}")
+            return cached
+        assert result.data
+
+        if cached is None:
+            self._connect_bot(yhc, result)
+        elif bot := cast(Optional[Bot], self.bots.get(yhc.app_id)):
+            bot.nickname = result.data.bot.nickname
+        return result
+
+    def _connect_bot(self, yhc: YunHuConfig, result: BotInfo) -> None:
+        assert result.data
+        bot_info = result.data.bot
+
+        bot = Bot(
+            self,
+            bot_info.botId,
+            bot_config=yhc,
+            nickname=bot_info.nickname,
+        )
+        dispatcher = EventDispatcher(
+            bot,
+            queue_size=self.configs.yunhu_event_queue_size,
+            workers=self.configs.yunhu_event_workers,
+            policy=self.configs.yunhu_event_queue_policy,
+            ordering=self.configs.yunhu_event_ordering,
+        )
+        dispatcher.start()
+        self.dispatchers[yhc.app_id] = dispatcher
+        self.bot_apps[yhc.app_id] = yhc
+        self.bot_connect(bot)
+        logger.info(
+            f"Bot {bot_info.nickname} ({bot_info.botId}) connected",
+        )
+        logger.info(f"当前 Bot 使用人数: {bot_info.headcount}")
+
+    def _load_bot_info_snapshot(self) -> dict[str, BotInfo]:
+        """读取上次成功获取的 Bot 信息快照，文件不存在或损坏时返回空"""
+        path = self.configs.yunhu_bot_info_snapshot
+        if path is None or not path.exists():
+            return {}
+        try:
+            data = self.json_codec.loads(path.read_bytes())
+            return {
+                app_id: type_validate(BotInfo, info) for app_id, info in data.items()
+            }
+        except Exception as e:
+            logger.warning(f"Failed to load bot info snapshot {path}: {type(e)}, {e}")
+            return {}
+
+    async def _save_bot_info_snapshot(
+        self, bootstraps: dict[str, "asyncio.Task[Optional[BotInfo]]"]
+    ) -> None:
+        """所有 Bot 获取完成后写入快照"""
+        path = self.configs.yunhu_bot_info_snapshot
+        assert path is not None
+        await asyncio.gather(*bootstraps.values())
+        data = {
+            app_id: model_dump(info)
+            for app_id, task in bootstraps.items()
+            if (info := task.result()) is not None
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.tmp")
+            tmp.write_bytes(self.json_codec.dumps(data))
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to save bot info snapshot {path}: {type(e)}, {e}")
 
     def setup(self) -> None:
         if not isinstance(self.driver, ASGIMixin):
@@ -111,6 +270,47 @@ class Adapter(BaseAdapter):
             )
             self.setup_http_server(setup)
         self.on_ready(self.startup)
+        self.driver.on_shutdown(self.shutdown)
+
+    async def shutdown(self) -> None:
+        """
+        优雅关闭：停止接收新事件，在 `yunhu_shutdown_timeout` 秒内
+        处理完已接收的事件与进行中的 API 调用，并报告被放弃的数量
+        """
+        self._closing = True
+        for task in self.tasks:
+            task.cancel()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.configs.yunhu_shutdown_timeout
+
+        abandoned_events = await asyncio.gather(
+            *(
+                dispatcher.drain(self.configs.yunhu_shutdown_timeout)
+                for dispatcher in self.dispatchers.values()
+            )
+        )
+
+        abandoned_calls = 0
+        if self._pending_calls:
+            _, pending = await asyncio.wait(
+                set(self._pending_calls), timeout=max(0, deadline - loop.time())
+            )
+            abandoned_calls = len(pending)
+
+        if sum(abandoned_events) or abandoned_calls:
+            logger.warning(
+                f"Shutdown deadline reached, abandoned {sum(abandoned_events)} "
+                f"event(s) and {abandoned_calls} API call(s)"
+            )
+        else:
+            logger.info("All pending events and API calls finished")
+
+        if self.recorder is not None:
+            self.recorder.close()
+            logger.info(
+                f"Recorded {self.recorder.count} webhook request(s) "
+                f"to {self.recorder.path}"
+            )
 
     def get_api_url(self, path: str) -> URL:
         return URL("https://chat-go.jwzhd.com").joinpath("open-apis/v1/", path)
@@ -121,10 +321,11 @@ class Adapter(BaseAdapter):
             Request(
                 "POST",
                 "https://chat-web-go.jwzhd.com/v1/bot/bot-info",
-                json={"botId": bot_config.app_id},
+                headers={"Content-Type": "application/json"},
+                content=self.json_codec.dumps({"botId": bot_config.app_id}),
             ),
         )
-        return type_validate_python(BotInfo, response)
+        return type_validate(BotInfo, response)
 
     async def send_request(self, request: Request, **data: Any):
         return_response = data.get("_return_response", False)
@@ -147,8 +348,7 @@ class Adapter(BaseAdapter):
 
                 if not is_json:
                     return content
-                content_str = content.decode('utf-8')
-                return json.loads(content_str)
+                return self.json_codec.loads(content)
 
             response = await self.driver.request(request)
 
@@ -160,14 +360,15 @@ class Adapter(BaseAdapter):
                     return response
 
                 if response.headers["Content-Type"].find("application/json") != -1:
-                    return json.loads(response.content)
+                    return self.json_codec.loads(response.content)
                 else:
                     return response.content
 
             raise NetworkError(
                 f"HTTP request received unexpected "
                 f"status code: {response.status_code}, "
-                f"response content: {response.content}"
+                f"response content: {response.content}",
+                status_code=response.status_code,
             )
 
         except YunHuAdapterException:
@@ -187,29 +388,105 @@ class Adapter(BaseAdapter):
         else:
             url = self.get_api_url(api)
             params["token"] = bot.bot_config.token
+        headers = {}
+        content = None
+        if (json_body := data.get("json")) is not None:
+            headers["Content-Type"] = "application/json"
+            content = self.json_codec.dumps(json_body)
+        elif (content := data.get("content")) is not None:
+            # 调用方已编码好的 JSON 请求体
+            headers["Content-Type"] = "application/json"
         request = Request(
             method=data["method"],
             url=url,
+            headers=headers,
             files=data.get("files"),
-            json=data.get("json"),
+            content=content,
             data=data.get("data"),
             params=params,
         )
 
-        result = await self.send_request(request, _use_stream=data.get("_use_stream"))
+        if not api.endswith(COALESCE_APIS):
+            return await self._send_api_request(request, data.get("_use_stream"))
+
+        key = (
+            bot.self_id,
+            url,
+            request.method,
+            tuple(sorted((k, str(v)) for k, v in params.items())),
+            content,
+        )
+        if (task := self._inflight.get(key)) is None:
+            task = asyncio.create_task(self._send_api_request(request, retry=True))
+            self._inflight[key] = task
+
+            def _done(task: asyncio.Task) -> None:
+                self._inflight.pop(key, None)
+                # 所有等待方都已取消时避免 "exception was never retrieved"
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+        # 某个等待方被取消不影响其他等待方
+        return await asyncio.shield(task)
+
+    async def _send_api_request(
+        self, request: Request, use_stream: Optional[bool] = None, retry: bool = False
+    ) -> Any:
+        """
+        发送请求并检查返回码
+
+        :param retry: 是否允许在网络错误时重试，仅用于只读接口，
+            发送、撤回、上传等接口超时后可能已经生效，重试会重复执行
+        """
+        pending = asyncio.get_running_loop().create_future()
+        self._pending_calls.add(pending)
+        retries = self.configs.yunhu_api_retries if retry else 0
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    # 请求体已在 _call_api 中编码，重试时原样重发，不再编码
+                    result = await self.send_request(request, _use_stream=use_stream)
+                    break
+                except NetworkError as e:
+                    # 4xx 重试也不会成功
+                    if (
+                        attempt >= retries
+                        or self._closing
+                        or (e.status_code is not None and e.status_code < 500)
+                    ):
+                        raise
+                    self.retried += 1
+                    delay = self.configs.yunhu_api_retry_delay * 2**attempt
+                    logger.warning(
+                        f"API request {request.url.path} failed: {e}, "
+                        f"retrying in {delay:.2f}s ({attempt + 1}/{retries})"
+                    )
+                    await asyncio.sleep(delay)
+        finally:
+            self._pending_calls.discard(pending)
+            pending.set_result(None)
         if isinstance(result, dict) and result.get("code") != 1:
             raise ActionFailed(message=result.get("msg"))
         return result
 
     async def _handle_http(self, request: Request) -> Response:
+        if self._closing:
+            return Response(503, content="Adapter is shutting down")
+
         bot_config = self.bot_apps.get(request.url.parts[-1])
         if bot_config is None:
             return Response(403, content="Corresponding bot config not found")
 
+        if self.recorder is not None and request.content is not None:
+            self.recorder.record(bot_config.app_id, request.content)
+
         if (data := request.content) is not None:
             try:
-                data = json.loads(data)
-            except json.JSONDecodeError:
+                data = self.json_codec.loads(data)
+            except ValueError:
                 return Response(400, content="Received non-JSON data")
 
         logger.debug(f"Received request: {data}")
@@ -218,21 +495,92 @@ class Adapter(BaseAdapter):
             if not (bot := self.bots.get(bot_config.app_id)):
                 return Response(404, content="Corresponding Bot instance not found")
 
-            if event := self.json_to_event(data):
-                bot = cast("Bot", bot)
+            dedup_key = None
+            if self.event_dedup is not None and (
+                event_id := self._get_event_id(data)
+            ):
+                dedup_key = (bot_config.app_id, event_id)
+                if not self.event_dedup.add(dedup_key):
+                    logger.debug(f"Duplicate event {event_id} ignored")
+                    return Response(200)
+
+            event = self.json_to_event(data, lazy=self.configs.yunhu_lazy_event)
+            if event:
                 logger.debug("Prepare to handle event")
-                task = asyncio.create_task(bot.handle_event(event))
-                task.add_done_callback(self.tasks.discard)
-                self.tasks.add(task)
+                dispatcher = self.dispatchers[bot_config.app_id]
+                try:
+                    accepted = await dispatcher.submit(event)
+                except BaseException:
+                    # 未能入队的事件需要云湖重试，不能把它记为已处理
+                    if dedup_key is not None:
+                        self.event_dedup.discard(dedup_key)
+                    raise
+                if not accepted:
+                    # 云湖会重试被拒绝的事件，不能把它记为已处理
+                    if dedup_key is not None:
+                        self.event_dedup.discard(dedup_key)
+                    if self._closing:
+                        return Response(503, content="Adapter is shutting down")
+                    logger.warning(
+                        f"Event queue of bot {bot.self_id} is full, "
+                        f"rejecting event {event.header.eventId}"
+                    )
+                    return Response(503, content="Event queue is full")
 
         return Response(200)
 
+    @staticmethod
+    def _get_event_id(json_data: Any) -> Optional[str]:
+        """在模型校验前从原始数据中取出 `header.eventId`"""
+        if isinstance(json_data, dict) and isinstance(
+            header := json_data.get("header"), dict
+        ):
+            event_id = header.get("eventId")
+            if isinstance(event_id, str):
+                return event_id
+        return None
+
+    @classmethod
+    def _resolve_event_model(cls, json_data: dict[str, Any]) -> type[Event]:
+        """根据原始数据选择最具体的事件模型"""
+        models = cls.get_event_model(_get_event_type(json_data))
+        return models[0] if models else Event
+
+    @classmethod
+    def _build_event_type_adapter(cls) -> Optional[TypeAdapter[Event]]:
+        """
+        构建所有事件模型的可辨识联合校验器，只在首次调用时构建
+
+        辨识值为事件模型的 `__event__`，由预先计算的分发表给出，
+        每个事件只需经过一次编译好的校验。
+        """
+        if cls._event_type_adapter is not None:
+            return cls._event_type_adapter
+        try:
+            from pydantic import Discriminator, Tag
+        except ImportError:  # pydantic v1 或 < 2.5
+            return None
+
+        def discriminator(value: Any) -> str:
+            if isinstance(value, dict):
+                return cls._resolve_event_model(value).__event__
+            return getattr(value, "__event__", Event.__event__)
+
+        members = tuple(
+            Annotated[model, Tag(model.__event__)]
+            for model in cls.event_models.values()
+        )
+        cls._event_type_adapter = TypeAdapter(
+            Annotated[Union[members], Discriminator(discriminator)]  # type: ignore
+        )
+        return cls._event_type_adapter
+
     @classmethod
-    def json_to_event(cls, json_data: Any) -> Optional[Event]:
+    def json_to_event(cls, json_data: Any, lazy: bool = False) -> Optional[Event]:
         """将 json 数据转换为 Event 对象。
         参数:
             json_data: json 数据
-            self_id: 当前 Event 对应的 Bot
+            lazy: 消息事件是否延迟校验，参考 `MessageEvent.construct_lazy`
         返回:
             Event 对象，如果解析失败则返回 None
         """
@@ -240,38 +588,32 @@ class Adapter(BaseAdapter):
             return
 
         try:
-            header = json_data["header"]
-            event_type = header.get("eventType", "")
-            if json_data.get("event", {}).get("message"):
-                event_type += f".{json_data['event']['message']['chatType']}"
-                if json_data["event"]["message"]["contentType"] == "tip":
-                    event_type = "group.tip"
-
-            models = cls.get_event_model(event_type)
-            for model in models:
-                try:
-                    event = type_validate_python(model, json_data)
-                    break
-                except Exception as e:
-                    logger.warning(f"Unsupported event: {json_data}\nError: {type(e)}, {e}")
-                    return
-            else:
-                event = type_validate_python(Event, json_data)
-
-            return event
-
+            if lazy:
+                model = cls._resolve_event_model(json_data)
+                # 缺少字段的事件回退到完整校验
+                if issubclass(model, MessageEvent) and has_lazy_fields(
+                    json_data.get("event")
+                ):
+                    return model.construct_lazy(json_data)
+            if type_adapter := cls._build_event_type_adapter():
+                return type_adapter.validate_python(json_data)
+            return type_validate(cls._resolve_event_model(json_data), json_data)
         except Exception as e:
-            logger.error(
-                "Failed to parse event.\n"
-                f"Raw: {json_data}\n",
-                f"Error: {type(e)}, {e}"
-            )
+            logger.warning(f"Unsupported event: {json_data}\nError: {type(e)}, {e}")
 
     @classmethod
     def get_event_model(cls, event_name: str) -> list[type[Event]]:
         """根据事件名获取对应 `Event Model` 及 `FallBack Event Model` 列表，
         不包括基类 `Event`。
+
+        结果来自预先计算的分发表，未知事件类型首次出现时解析并记忆。
+        返回的列表为共享对象，请勿修改。
         """
-        return [model.value for model in cls.event_models.prefixes(f".{event_name}")][
+        if (models := cls._event_model_table.get(event_name)) is not None:
+            return models
+        models = [model.value for model in cls.event_models.prefixes(f".{event_name}")][
             ::-1
         ]
+        if len(cls._event_model_table) < cls._EVENT_MODEL_TABLE_LIMIT:
+            cls._event_model_table[event_name] = models
+        return models
@@ -1,3 +1,6 @@
+from collections.abc import Iterable
+from copy import deepcopy
+from functools import partial
 from pathlib import Path
 import re
 import time
@@ -6,8 +9,8 @@ import filetype
 from typing_extensions import override
 
 from nonebot.adapters import Bot as BaseBot
+from nonebot.compat import PYDANTIC_V2
 from nonebot.log import logger
-from nonebot.compat import type_validate_python
 from nonebot.message import handle_event
 
 
@@ -20,55 +23,193 @@ from .models import (
     BaseTextContent,
     BASE_TEXT_TYPE,
     BaseNotice,
+    BotNoticeDetail,
+    GroupNoticeDetail,
+    MessageEventDetail,
+    TipNoticeDetail,
 )
 
+from .cache import LRUCache, SWRCache, UserProfile
 from .exception import ActionFailed
 
 from .config import YunHuConfig
 from .event import (
     Event,
+    GroupJoinNoticeEvent,
+    GroupLeaveNoticeEvent,
     GroupMessageEvent,
     InstructionMessageEvent,
     MessageEvent,
     PrivateMessageEvent,
     NoticeEvent,
 )
+from .lazy import LazyMessageEventDetail
+from .prepared import PreparedMessage
 from .message import Message, MessageSegment
 
 if TYPE_CHECKING:
     from .adapter import Adapter
 
 
-from .tool import fetch_bytes
+from .tool import build_trie_pattern, fetch_bytes
+from .validators import type_validate, validate_send_msg_response
+
+
+async def _fetch_reply(bot: "Bot", event: MessageEvent) -> Reply:
+    """获取事件引用的消息，优先从缓存读取"""
+    parent_id = cast(str, event.event.message.parentId)
+    result = bot.get_cached_reply(parent_id)
+    if result is None:
+        if event.event.message.chatType == "bot":
+            chat_id = event.event.sender.senderId
+        else:
+            chat_id = event.event.message.chatId
+        start = time.perf_counter()
+        result = await bot.get_msg(parent_id, chat_id, event.event.message.chatType)
+        bot._reply_fetch_time += time.perf_counter() - start
+        bot.cache_reply(result.msgId, result)
+    return result
+
+
+def _has_parent(event: MessageEvent) -> bool:
+    parent_id = event.event.message.parentId
+    return bool(parent_id) and parent_id != event.event.message.msgId
 
 
 async def _check_reply(bot: "Bot", event: "Event"):
-    if not isinstance(event, MessageEvent):
+    if not isinstance(event, MessageEvent) or not _has_parent(event):
         return
 
-    if not event.event.message.parentId:
+    try:
+        result = await _fetch_reply(bot, event)
+        if result.senderId == bot.bot_config.app_id:
+            event.to_me = True
+            event.reply = result
+
+    except Exception as e:
+        logger.error(f"Failed to get reply message e: {type(e)}, {e}")
+
+
+def _check_reply_local(bot: "Bot", event: "Event"):
+    """
+    仅根据本地信息判断是否引用了机器人的消息，不发起网络请求
+
+    被引用的消息需在机器人最近发送的消息ID索引中，``reply`` 由 `MessageEvent.get_reply` 按需获取。
+    """
+    if not isinstance(event, MessageEvent) or not _has_parent(event):
         return
 
-    if event.event.message.parentId != event.event.message.msgId:
-        try:
-            if event.event.message.chatType == "bot":
-                chat_id = event.event.sender.senderId
-            else:
-                chat_id = event.event.message.chatId
-            result = await bot.get_msg(
-                event.event.message.parentId,
-                chat_id,
-                event.event.message.chatType,
-            )
-            if result.senderId == bot.bot_config.app_id:
-                event.to_me = True
-                event.reply = result
+    if event.event.message.parentId in bot.sent_msg_ids:
+        event.to_me = True
 
-        except Exception as e:
-            logger.error(f"Failed to get reply message e: {type(e)}, {e}")
+
+def _reply_from_event(event: MessageEvent) -> Callable[[], Reply]:
+    """
+    提取构造 `Reply` 所需的字段，返回按需构造 `Reply` 的函数
+
+    只保留这些字段，缓存不会让整个事件及其消息对象常驻内存。
+    延迟校验的事件直接读取原始数据，构造时再校验；其余事件的字段已经过校验，直接构造。
+    """
+    detail = event.event
+    if isinstance(detail, LazyMessageEventDetail):
+        message = detail.message.raw
+        sender = detail.raw["sender"]
+        return partial(
+            type_validate,
+            Reply,
+            {
+                "msgId": message["msgId"],
+                "parentId": message.get("parentId") or "",
+                "senderId": sender["senderId"],
+                "senderType": "user",
+                "senderNickname": sender["senderNickname"],
+                "contentType": message["contentType"],
+                "content": message["content"],
+                "commandId": message.get("commandId"),
+                "commandName": message.get("commandName"),
+                "sendTime": message["sendTime"],
+            },
+        )
+    message = detail.message
+    sender = detail.sender
+    return partial(
+        Reply.model_construct if PYDANTIC_V2 else Reply.construct,
+        msgId=message.msgId,
+        parentId=message.parentId or "",
+        senderId=sender.senderId,
+        senderType="user",
+        senderNickname=sender.senderNickname,
+        contentType=message.contentType,
+        content=message.content,
+        commandId=message.commandId,
+        commandName=message.commandName,
+        sendTime=message.sendTime,
+    )
 
 
-def _check_at_me(bot: "Bot", event: "Event"):
+def _flush_text(
+    result: list[MessageSegment], text: str, text_seg: Optional[MessageSegment]
+) -> None:
+    """追加合并后的文本；文本只来自一个消息段且未被修改时直接复用该消息段，空文本丢弃"""
+    if text_seg is not None and text is text_seg.data["text"]:
+        if text:
+            result.append(text_seg)
+    elif text:
+        result.append(MessageSegment.text(text))
+
+
+def _strip_at_me(
+    message: Message, self_id: str
+) -> Optional[list[MessageSegment]]:
+    """
+    单次遍历移除 @Bot 的消息段，去除其两侧文本的空白并合并相邻的文本段
+
+    空白按合并后的连续文本去除，会跨过空的或只含空白的文本段，
+    例如 ``[at(bot), text(""), text(" c")]`` 得到 ``"c"``(旧实现只处理紧邻的一个文本段，得到 ``" c"``)。
+    不修改原有的消息段，未提及 Bot 时返回 ``None``
+    """
+    result: list[MessageSegment] = []
+    text: Optional[str] = None
+    """待合并的连续文本"""
+    text_seg: Optional[MessageSegment] = None
+    """连续文本只来自一个消息段时为该消息段"""
+    found = False
+    strip_next = False
+
+    for seg in message:
+        if seg.type == "text":
+            value = seg.data["text"]
+            if strip_next:
+                value = value.lstrip()
+                strip_next = not value
+            if text is None:
+                text, text_seg = value, seg
+            else:
+                text += value
+                text_seg = None
+        elif seg.type == "at" and seg.data.get("user_id") == self_id:
+            found = True
+            # 去除前面文本末尾的空白，只需检查合并后文本的末尾
+            if text is not None:
+                text = text.rstrip()
+            strip_next = True
+        else:
+            if text is not None:
+                _flush_text(result, text, text_seg)
+                text = None
+            result.append(seg)
+            strip_next = False
+    if not found:
+        return None
+    if text is not None:
+        _flush_text(result, text, text_seg)
+    if not result:
+        # 匹配规则要求消息至少有一个消息段
+        result.append(MessageSegment.text(""))
+    return result
+
+
+def _check_at_me(bot: "Bot", event: "Event") -> bool:
     """
     :说明:
 
@@ -77,34 +218,49 @@ def _check_at_me(bot: "Bot", event: "Event"):
 
       * ``bot: Bot``: Bot 对象
       * ``event: Event``: Event 对象
+    :返回:
+
+      是否提及了 Bot
     """
     if not isinstance(event, MessageEvent):
-        return
+        return False
 
-    at_list = event.event.message.content.at
+    detail = event.event
+    if isinstance(detail, LazyMessageEventDetail):
+        # 直接读取原始数据，未提及任何人时不触发校验与反序列化
+        at_list = detail.message.raw["content"].get("at")
+    else:
+        at_list = detail.message.content.at
     if not at_list:
-        return
+        return False
 
-    if bot.bot_config.app_id in at_list:
-        event.to_me = True
+    message = event.get_message()
+    if (stripped := _strip_at_me(message, bot.bot_config.app_id)) is not None:
+        message[:] = stripped
+    elif bot.bot_config.app_id not in at_list:
+        return False
+    # 无法对应到消息段的提及同样视为提及了 Bot
+    event.to_me = True
+    return True
 
-        message = event.get_message()
-
-        i = 0
-        while i < len(message):
-            seg = message[i]
-            # 如果是@消息段且是@当前机器人
-            if seg.type == "at" and seg.data.get("user_id") == bot.bot_config.app_id:
-                # 移除这个@消息段
-                message.pop(i)
-                # 如果前面有文本段，去除末尾空格
-                if i > 0 and message[i - 1].type == "text":
-                    message[i - 1].data["text"] = message[i - 1].data["text"].rstrip()
-                # 如果后面还有文本段，去除开头空格
-                if i < len(message) and message[i].type == "text":
-                    message[i].data["text"] = message[i].data["text"].lstrip()
-            else:
-                i += 1
+
+def _get_nickname_pattern(bot: "Bot") -> Optional[re.Pattern[str]]:
+    """
+    获取编译好的昵称匹配正则
+
+    昵称配置被替换时重新编译；原地修改需调用 `Bot.invalidate_nickname_pattern`
+    """
+    nicknames = bot.config.nickname
+    # 只比较对象本身，每条消息的开销与昵称数量无关
+    if bot._nickname_key is not nicknames:
+        bot._nickname_key = nicknames
+        pattern = build_trie_pattern(nicknames)
+        bot._nickname_pattern = (
+            re.compile(rf"^({pattern})([\s,，]*|$)", re.IGNORECASE)
+            if pattern
+            else None
+        )
+    return bot._nickname_pattern
 
 
 def _check_nickname(bot: "Bot", event: "Event"):
@@ -120,22 +276,27 @@ def _check_nickname(bot: "Bot", event: "Event"):
     """
     if not isinstance(event, MessageEvent):
         return
-    first_msg_seg: MessageSegment = event.get_message()[0]
-    if first_msg_seg.type != "text":
+    if not (nickname_pattern := _get_nickname_pattern(bot)):
+        return
+    detail = event.event
+    if isinstance(detail, LazyMessageEventDetail) and not detail.message.commandName:
+        # 首个文本段是原始文本的前缀，原始文本不以昵称开头时无需反序列化
+        text = detail.message.raw["content"].get("text")
+        if not isinstance(text, str) or not nickname_pattern.match(text):
+            return
+    message = event.get_message()
+    if not message or message[0].type != "text":
         return
+    first_msg_seg: MessageSegment = message[0]
 
-    if nicknames := set(filter(lambda n: n, bot.config.nickname)):
-        # check if the user is calling me with my nickname
-        nickname_regex = "|".join(nicknames)
-        first_text = first_msg_seg.data["text"]
+    # check if the user is calling me with my nickname
+    first_text = first_msg_seg.data["text"]
 
-        if m := re.search(
-            rf"^({nickname_regex})([\s,，]*|$)", first_text, re.IGNORECASE
-        ):
-            nickname = m[1]
-            logger.debug(f"User is calling me {nickname}")
-            event.to_me = True
-            first_msg_seg.data["text"] = first_text[m.end() :]
+    if m := nickname_pattern.match(first_text):
+        nickname = m[1]
+        logger.debug(f"User is calling me {nickname}")
+        event.to_me = True
+        message[0] = MessageSegment.text(first_text[m.end() :])
 
 
 async def send(
@@ -182,7 +343,7 @@ async def send(
     full_message += message
     # 在序列化消息前完成资源上传
     full_message = await upload_resource_data(bot, full_message)
-    content, msg_type = full_message.serialize()
+    content, msg_type = full_message.serialize(bot.bot_config.encode_emoji)
     if reply_to is True and isinstance(event, MessageEvent):
         parent_id = event.event.message.msgId
     elif isinstance(reply_to, (str, int)):
@@ -249,10 +410,17 @@ class Bot(BaseBot):
     """Bot 配置"""
     nickname: str
     """Bot 昵称"""
-    _user_nickname_cache: dict[str, tuple[float, str]]
-    """user_id -> (expire_ts, nickname)"""
-    _USER_NICK_TTL: int = 300  # 5 分钟
-    """单个昵称缓存有效期，秒"""
+    user_profiles: LRUCache[str, UserProfile]
+    """user_id -> 用户资料缓存，由收到的事件被动填充"""
+    group_cache: SWRCache[str, GroupInfo]
+    """group_id -> 群信息缓存"""
+    _nickname_key: Optional[Iterable[str]] = None
+    """编译昵称正则时的昵称配置对象"""
+    _nickname_pattern: Optional[re.Pattern[str]] = None
+    reply_cache: LRUCache[str, Union[Reply, Callable[[], Reply]]]
+    """msgId -> 引用消息缓存，值可以是延迟构造 `Reply` 的函数"""
+    sent_msg_ids: LRUCache[str, bool]
+    """机器人最近发送的消息ID索引，用于不请求接口判断是否引用了机器人"""
 
     @override
     def __init__(
@@ -266,23 +434,120 @@ class Bot(BaseBot):
         super().__init__(adapter, self_id)
         self.bot_config = bot_config
         self.nickname = nickname
-        self._user_nickname_cache = {}
+        self.user_profiles = LRUCache(
+            adapter.configs.yunhu_user_cache_size, adapter.configs.yunhu_user_cache_ttl
+        )
+        self.group_cache = SWRCache(
+            self._fetch_group_info,
+            adapter.configs.yunhu_group_cache_size,
+            adapter.configs.yunhu_group_cache_ttl,
+        )
+        self.reply_cache = LRUCache(adapter.configs.yunhu_reply_cache_size)
+        self.sent_msg_ids = LRUCache(adapter.configs.yunhu_sent_index_size)
+        self._lazy_reply = adapter.configs.yunhu_lazy_reply
+        self._reply_fetch_time: float = 0.0
+        """引用消息缓存未命中时请求 `get_msg` 的累计耗时，秒"""
+
+    def invalidate_nickname_pattern(self) -> None:
+        """原地修改 ``config.nickname`` 后调用，下一条消息时重新编译昵称匹配正则"""
+        self._nickname_key = None
+
+    def cache_reply(
+        self, msg_id: str, reply: Union[Reply, Callable[[], Reply]]
+    ) -> None:
+        """缓存消息，供引用该消息时使用"""
+        self.reply_cache.set(msg_id, reply)
+
+    def get_cached_reply(self, msg_id: str) -> Optional[Reply]:
+        """从缓存获取消息，未命中时返回 ``None``"""
+        reply = self.reply_cache.get(msg_id)
+        if reply is None or isinstance(reply, Reply):
+            return reply
+        try:
+            reply = reply()
+        except Exception as e:
+            logger.debug(f"Failed to build cached reply {msg_id}: {type(e)}, {e}")
+            self.reply_cache.pop(msg_id)
+            return None
+        self.reply_cache.set(msg_id, reply)
+        return reply
+
+    def reply_cache_stats(self) -> dict[str, Any]:
+        """引用消息缓存统计，``saved_seconds`` 按未命中时的平均请求耗时估算"""
+        stats = self.reply_cache.stats()
+        misses = stats["misses"]
+        avg_fetch = self._reply_fetch_time / misses if misses else 0.0
+        stats["avg_fetch_seconds"] = avg_fetch
+        stats["saved_seconds"] = avg_fetch * stats["hits"]
+        return stats
+
+    def _build_sent_reply(
+        self,
+        msg_id: str,
+        content: dict[str, Any],
+        content_type: str,
+        parent_id: Optional[str],
+        send_time: int,
+    ) -> Reply:
+        return type_validate(
+            Reply,
+            {
+                "msgId": msg_id,
+                "parentId": parent_id or "",
+                "senderId": self.bot_config.app_id,
+                "senderType": "bot",
+                "senderNickname": self.nickname,
+                "contentType": content_type,
+                "content": content,
+                "sendTime": send_time,
+            },
+        )
 
-    async def _get_user_nickname(self, user_id: str) -> str:
-        """带 TTL 的用户昵称缓存封装"""
-        now = time.time()
-        cached = self._user_nickname_cache.get(user_id)
-        if cached and cached[0] > now:
-            return cached[1]
+    def remember_user(self, user_id: str, nickname: str, avatar_url: str) -> None:
+        """缓存用户资料"""
+        if user_id and nickname:
+            self.user_profiles.set(user_id, UserProfile(nickname, avatar_url))
+
+    def _remember_event_user(self, event: Event) -> None:
+        """从事件中记录发送者资料，延迟校验的事件直接读取原始数据"""
+        detail = event.event
+        if isinstance(detail, LazyMessageEventDetail):
+            sender = detail.raw.get("sender") or {}
+            self.remember_user(
+                sender.get("senderId", ""),
+                sender.get("senderNickname", ""),
+                sender.get("senderAvatarUrl", ""),
+            )
+        elif isinstance(detail, (MessageEventDetail, TipNoticeDetail)):
+            sender = detail.sender
+            self.remember_user(
+                sender.senderId, sender.senderNickname, sender.senderAvatarUrl
+            )
+        elif isinstance(detail, (GroupNoticeDetail, BotNoticeDetail)):
+            self.remember_user(detail.userId, detail.nickname, detail.avatarUrl)
+
+    async def get_user_profile(self, user_id: str) -> UserProfile:
+        """获取用户资料，优先从缓存读取"""
+        if (profile := self.user_profiles.get(user_id)) is not None:
+            return profile
 
         user_info = await self.get_user_info(user_id)
         if user_info.data and user_info.data.user.nickname:
-            nickname = user_info.data.user.nickname
+            user = user_info.data.user
+            profile = UserProfile(user.nickname, user.avatarUrl)
         else:
-            nickname = user_id
+            profile = UserProfile(user_id, "")
+        self.user_profiles.set(user_id, profile)
+        return profile
 
-        self._user_nickname_cache[user_id] = (now + self._USER_NICK_TTL, nickname)
-        return nickname
+    def user_cache_stats(self) -> dict[str, Any]:
+        """用户资料缓存统计，``memory`` 为估算的内存占用，字节"""
+        stats = self.user_profiles.stats()
+        stats["memory"] = self.user_profiles.memory_usage()
+        return stats
+
+    async def _get_user_nickname(self, user_id: str) -> str:
+        return (await self.get_user_profile(user_id)).nickname
 
     async def get_msgs(
         self, chat_id: str, chat_type: Literal["user", "group"], **params: Any
@@ -313,7 +578,7 @@ class Bot(BaseBot):
             raise ActionFailed(
                 message=response.get("msg", "Unknown error"),
             )
-        return type_validate_python(list[Reply], response["data"]["list"])
+        return type_validate(list[Reply], response["data"]["list"])
 
     async def get_msg(
         self, message_id: str, chat_id: str, chat_type: Literal["group", "user", "bot"]
@@ -346,7 +611,7 @@ class Bot(BaseBot):
             raise ActionFailed(
                 message=response.get("msg", "Unknown error"),
             )
-        return type_validate_python(Reply, response["data"]["list"][0])
+        return type_validate(Reply, response["data"]["list"][0])
 
     async def delete_msg(
         self, message_id: str, chat_id: str, chat_type: Literal["user", "group"]
@@ -362,6 +627,7 @@ class Bot(BaseBot):
             用户: user
             群: group
         """
+        self.reply_cache.pop(message_id)
         return await self.call_api(
             "bot/recall",
             method="POST",
@@ -393,6 +659,7 @@ class Bot(BaseBot):
         :params content: 消息内容
         :param content_type: 消息类型
         """
+        self.reply_cache.pop(message_id)
         return await self.call_api(
             "bot/edit",
             method="POST",
@@ -405,15 +672,35 @@ class Bot(BaseBot):
             },
         )
 
-    async def get_group_info(self, group_id: str):
-        """获取群信息"""
+    async def get_group_info(self, group_id: str, use_cache: bool = True):
+        """
+        获取群信息
 
+        :param use_cache: 是否使用缓存，缓存过期时返回旧值并在后台刷新
+        """
+        if not use_cache:
+            info = await self._fetch_group_info(group_id)
+            self.group_cache.set(group_id, info)
+            return info
+        return await self.group_cache.get(group_id)
+
+    def _update_group_headcount(self, group_id: str, delta: int) -> None:
+        """成员变动时修正缓存的群人数，并标记过期以便后台刷新"""
+        if (info := self.group_cache.peek(group_id)) is None:
+            return
+        # 不修改读取方可能持有的旧对象
+        info = deepcopy(info)
+        if info.data:
+            info.data.group.headcount += delta
+        self.group_cache.set(group_id, info, stale=True)
+
+    async def _fetch_group_info(self, group_id: str) -> GroupInfo:
         response = await self.call_api(
             "https://chat-web-go.jwzhd.com/v1/group/group-info",
             method="POST",
             json={"groupId": group_id},
         )
-        return type_validate_python(GroupInfo, response)
+        return type_validate(GroupInfo, response)
 
     async def get_user_info(self, user_id: str):
         """获取用户信息"""
@@ -423,7 +710,7 @@ class Bot(BaseBot):
             method="GET",
             params={"userId": user_id},
         )
-        return type_validate_python(UserInfo, response)
+        return type_validate(UserInfo, response)
 
     async def set_group_board(
         self,
@@ -454,7 +741,7 @@ class Bot(BaseBot):
                 "expireTime": expire_time,
             },
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def dismiss_group_board(
         self,
@@ -476,7 +763,7 @@ class Bot(BaseBot):
                 "memberId": memberId,
             },
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def set_user_board(
         self,
@@ -504,7 +791,7 @@ class Bot(BaseBot):
                 "expireTime": expire_time,
             },
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def dismiss_user_board(
         self,
@@ -523,7 +810,7 @@ class Bot(BaseBot):
                 "chatId": user_id,
             },
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def set_all_board(
         self,
@@ -547,7 +834,7 @@ class Bot(BaseBot):
                 "expireTime": expire_time,
             },
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def dismiss_all_board(self):
         """
@@ -557,7 +844,7 @@ class Bot(BaseBot):
             "bot/board-all-dismiss",
             method="POST",
         )
-        return type_validate_python(BoardResponse, response)
+        return type_validate(BoardResponse, response)
 
     async def send_msg(
         self,
@@ -603,7 +890,75 @@ class Bot(BaseBot):
                     "parentId": parent_id,
                 },
             )
-        return type_validate_python(SendMsgResponse, result)
+        return self._handle_send_result(result, content, content_type, parent_id)
+
+    async def prepare_message(
+        self, message: Union[str, Message, MessageSegment]
+    ) -> PreparedMessage:
+        """
+        预先上传资源、序列化并编码消息，用于向大量对象发送同一条消息
+
+        :param message: 要发送的消息
+        """
+        message = message if isinstance(message, Message) else Message(message)
+        message = await upload_resource_data(self, message)
+        content, content_type = message.serialize(self.bot_config.encode_emoji)
+        return PreparedMessage(
+            content, content_type, cast("Adapter", self.adapter).json_codec
+        )
+
+    async def send_prepared(
+        self,
+        receive_type: Literal["group", "user"],
+        receive_id: str,
+        message: PreparedMessage,
+        parent_id: Optional[str] = None,
+    ) -> SendMsgResponse:
+        """
+        发送预先准备好的消息，不使用流式回复
+
+        :param receive_type: 接收对象类型
+        :param receive_id: 接收对象ID
+        :param message: `prepare_message` 返回的消息
+        :param parent_id: 被引用的消息ID
+        """
+        result = await self.call_api(
+            "bot/send",
+            method="POST",
+            content=message.encode(receive_id, receive_type, parent_id),
+        )
+        return self._handle_send_result(
+            result, message.content, message.content_type, parent_id
+        )
+
+    def _handle_send_result(
+        self,
+        result: dict[str, Any],
+        content: dict[str, Any],
+        content_type: str,
+        parent_id: Optional[str],
+    ) -> SendMsgResponse:
+        response = validate_send_msg_response(
+            result, self.bot_config.trust_send_response
+        )
+        if not response.data:
+            return response
+        msg_id = response.data.messageInfo.msgId
+        self.sent_msg_ids.set(msg_id, True)
+        if content_type in {"text", "markdown", "html"}:
+            # 延迟到被引用时才构造，不增加发送路径的开销
+            self.cache_reply(
+                msg_id,
+                partial(
+                    self._build_sent_reply,
+                    msg_id,
+                    content,
+                    content_type,
+                    parent_id,
+                    int(time.time() * 1000),
+                ),
+            )
+        return response
 
     async def upload_file(
         self,
@@ -751,8 +1106,31 @@ class Bot(BaseBot):
         return await super().call_api(api, **data)
 
     async def handle_event(self, event: Event) -> None:
+        await self.prepare_event(event)
+        await self.dispatch_event(event)
+
+    async def prepare_event(self, event: Event) -> None:
+        """
+        分发前的适配器预处理：更新缓存、检查 `to_me`、获取引用的消息
+
+        事件分发器按会话顺序调用，之后再交给 `dispatch_event`。
+        """
+        self._remember_event_user(event)
+        if isinstance(event, GroupJoinNoticeEvent):
+            self._update_group_headcount(event.event.chatId, 1)
+        elif isinstance(event, GroupLeaveNoticeEvent):
+            self._update_group_headcount(event.event.chatId, -1)
         if isinstance(event, MessageEvent):
+            self.cache_reply(event.event.message.msgId, _reply_from_event(event))
             _check_at_me(self, event)
             _check_nickname(self, event)
-            await _check_reply(self, event)
+            if self._lazy_reply:
+                _check_reply_local(self, event)
+            else:
+                await _check_reply(self, event)
+            if event.reply is None and _has_parent(event):
+                setattr(event, "_reply_resolver", partial(_fetch_reply, self, event))
+
+    async def dispatch_event(self, event: Event) -> None:
+        """将预处理后的事件交给 NoneBot 匹配并运行事件响应器"""
         await handle_event(self, event)
@@ -0,0 +1,224 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Hashable
+import sys
+import time
+from typing import Any, Callable, Generic, NamedTuple, Optional, TypeVar
+
+from nonebot.log import logger
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TTLSet(Generic[K]):
+    """
+    有界、按 TTL 过期的集合
+
+    所有元素使用同一 TTL，插入顺序即过期顺序，过期清理只需检查队首；
+    超过容量时淘汰最早的元素，因此内存占用有固定上限，单次操作均摊 O(1)。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits: int = 0
+        """已存在(重复)次数"""
+        self.misses: int = 0
+        """新元素次数"""
+        self._data: OrderedDict[K, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        expire = self._data.get(key)
+        return expire is not None and expire > time.monotonic()
+
+    def _evict(self, now: float) -> None:
+        data = self._data
+        while data and next(iter(data.values())) <= now:
+            data.popitem(last=False)
+
+    def add(self, key: K) -> bool:
+        """
+        添加元素
+
+        :return: 元素是否为新元素，已存在且未过期时返回 ``False``
+        """
+        now = time.monotonic()
+        self._evict(now)
+        if key in self._data:
+            self.hits += 1
+            return False
+        self.misses += 1
+        self._data[key] = now + self.ttl
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return True
+
+    def discard(self, key: K) -> None:
+        """移除元素"""
+        self._data.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    有界 LRU 缓存
+
+    命中时移动到队尾，超过容量时淘汰最久未使用的元素，单次操作 O(1)；
+    指定 ``ttl`` 时元素写入后超过该时长即视为不存在。
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits: int = 0
+        """命中次数"""
+        self.misses: int = 0
+        """未命中次数"""
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: dict[K, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        if key not in self._data:
+            return False
+        return self.ttl is None or self._expires[key] > time.monotonic()
+
+    def get(self, key: K) -> Optional[V]:
+        """获取元素并计入命中统计，不存在或已过期时返回 ``None``"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        if self.ttl is not None and self._expires[key] <= time.monotonic():
+            self.pop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.ttl is not None:
+            self._expires[key] = time.monotonic() + self.ttl
+        if len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self._expires.pop(evicted, None)
+
+    def pop(self, key: K) -> Optional[V]:
+        """移除元素"""
+        self._expires.pop(key, None)
+        return self._data.pop(key, None)
+
+    def memory_usage(self) -> int:
+        """估算占用的内存，字节，包括容器、键与值(展开一层元组)"""
+        size = sys.getsizeof(self._data) + sys.getsizeof(self._expires)
+        for key, value in self._data.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+            if isinstance(value, tuple):
+                size += sum(sys.getsizeof(item) for item in value)
+        if self._expires:
+            size += len(self._expires) * sys.getsizeof(0.0)
+        return size
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class SWRCache(Generic[K, V]):
+    """
+    有界、过期后在后台刷新的缓存(stale-while-revalidate)
+
+    首次获取时等待 ``loader`` 加载；超过 ``ttl`` 的元素仍直接返回旧值，
+    同时在后台刷新，读取方不会等待刷新。刷新失败时保留旧值，下次读取再重试。
+    """
+
+    def __init__(
+        self, loader: Callable[[K], Awaitable[V]], maxsize: int, ttl: float
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.refreshes: int = 0
+        """后台刷新次数"""
+        self.refresh_errors: int = 0
+        """后台刷新失败次数"""
+        self._entries: LRUCache[K, tuple[float, V]] = LRUCache(maxsize)
+        self._refreshing: dict[K, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: K) -> V:
+        """获取元素，未缓存时等待加载"""
+        if (entry := self._entries.get(key)) is None:
+            value = await self.loader(key)
+            self.set(key, value)
+            return value
+        fetched, value = entry
+        if fetched + self.ttl <= time.monotonic() and key not in self._refreshing:
+            task = asyncio.create_task(self._refresh(key))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return value
+
+    def peek(self, key: K) -> Optional[V]:
+        """读取缓存的值，不计入统计也不触发刷新"""
+        entry = self._entries._data.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: K, value: V, stale: bool = False) -> None:
+        """
+        写入元素
+
+        :param stale: 标记为已过期，下次读取时返回该值并触发后台刷新
+        """
+        self._entries.set(key, (0.0 if stale else time.monotonic(), value))
+
+    def pop(self, key: K) -> Optional[V]:
+        """移除元素"""
+        entry = self._entries.pop(key)
+        return entry[1] if entry is not None else None
+
+    async def _refresh(self, key: K) -> None:
+        self.refreshes += 1
+        try:
+            value = await self.loader(key)
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Failed to refresh cached {key!r}: {type(e)}, {e}")
+            return
+        if key in self._entries:
+            self.set(key, value)
+
+    def stats(self) -> dict[str, Any]:
+        stats = self._entries.stats()
+        stats["refreshes"] = self.refreshes
+        stats["refresh_errors"] = self.refresh_errors
+        return stats
+
+
+class UserProfile(NamedTuple):
+    """缓存的用户资料"""
+
+    nickname: str
+    """用户昵称"""
+    avatarUrl: str
+    """用户头像"""
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Callable, Literal, NamedTuple, Union
+
+JSONBackend = Literal["auto", "orjson", "msgspec", "json"]
+"""JSON 编解码后端，auto 按 orjson > msgspec > json 的顺序选择已安装的实现"""
+
+
+class JSONCodec(NamedTuple):
+    """
+    JSON 编解码器
+
+    ``loads`` 直接接受 bytes，无需先解码为 str；解析失败时抛出 ``ValueError``。
+    ``dumps`` 直接输出 UTF-8 编码的 bytes，可作为请求体发送。
+    """
+
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+
+def _stdlib_codec() -> JSONCodec:
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return encoder.encode(obj).encode("utf-8")
+
+    return JSONCodec("json", json.loads, dumps)
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson
+
+    return JSONCodec("orjson", orjson.loads, orjson.dumps)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec
+
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    return JSONCodec("msgspec", decoder.decode, encoder.encode)
+
+
+_BACKENDS: dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def get_json_codec(backend: JSONBackend = "auto") -> JSONCodec:
+    """
+    获取 JSON 编解码器
+
+    :param backend: 指定后端，auto 时自动选择已安装的最快实现
+    :raises ImportError: 指定的后端未安装
+    """
+    if backend != "auto":
+        return _BACKENDS[backend]()
+    for name in ("orjson", "msgspec"):
+        try:
+            return _BACKENDS[name]()
+        except ImportError:
+            continue
+    return _stdlib_codec()
+
+
+__all__ = ["JSONBackend", "JSONCodec", "get_json_codec"]
@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Literal, Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -10,9 +13,63 @@ class YunHuConfig(BaseModel):
     """机器人Token"""
     use_stream: bool = Field(default=False)
     """是否使用流式回复"""
+    trust_send_response: bool = Field(default=False)
+    """信任发送消息接口的返回结构，跳过 `SendMsgResponse` 的深度校验"""
+    encode_emoji: bool = Field(default=False)
+    """发送文本消息时将字符emoji转为云湖表情 `[.<code>]`"""
 
 
 class Config(BaseModel):
 
     yunhu_bots: list[YunHuConfig] = Field(default_factory=list)
     """云湖机器人配置列表"""
+    yunhu_event_queue_size: int = Field(1000)
+    """每个 Bot 的事件队列总容量，由各分片平分"""
+    yunhu_event_workers: int = Field(8)
+    """每个 Bot 的事件分片数量，同一会话的事件在同一分片内按序处理"""
+    yunhu_event_ordering: Literal["strict", "start"] = Field("strict")
+    """同一会话内事件的顺序保证：strict 等前一个事件处理完毕再处理下一个；
+    start 仅按序预处理、事件响应器并发运行，供在处理函数内等待后续消息的 waiter 类插件使用"""
+    yunhu_event_queue_policy: Literal["block", "drop_oldest", "reject"] = Field(
+        "block"
+    )
+    """事件队列已满时的处理策略：等待/丢弃最早事件/返回 503 让云湖重试"""
+    yunhu_event_dedup_size: int = Field(4096)
+    """按 eventId 去重时记忆的最近事件数量，为 0 时关闭去重"""
+    yunhu_event_dedup_ttl: float = Field(300)
+    """事件去重记忆时长，秒"""
+    yunhu_json_backend: Literal["auto", "orjson", "msgspec", "json"] = Field("auto")
+    """JSON 编解码后端，auto 时按 orjson > msgspec > json 自动选择"""
+    yunhu_lazy_event: bool = Field(False)
+    """消息事件延迟校验，`sender`、`message.content` 等在首次访问时才校验，
+    适配器分发前的检查直接读取原始数据"""
+    yunhu_shutdown_timeout: float = Field(10)
+    """关闭时等待事件与 API 调用完成的最长时间，秒"""
+    yunhu_record_path: Optional[Path] = Field(None)
+    """webhook 流量录制文件路径(JSONL)，用于离线回放压测，为空时不录制"""
+    yunhu_reply_cache_size: int = Field(2048)
+    """每个 Bot 缓存的最近消息数量，用于引用消息时免去 `get_msg` 请求"""
+    yunhu_lazy_reply: bool = Field(False)
+    """不在分发前请求引用的消息，`to_me` 仅根据机器人最近发送的消息ID判断，
+    引用的消息通过 `MessageEvent.get_reply` 按需获取"""
+    yunhu_sent_index_size: int = Field(8192)
+    """每个 Bot 记录的最近发送消息ID数量"""
+    yunhu_user_cache_size: int = Field(10000)
+    """每个 Bot 缓存的用户资料(昵称、头像)数量"""
+    yunhu_user_cache_ttl: int = Field(3600)
+    """用户资料缓存有效期，秒"""
+    yunhu_group_cache_size: int = Field(1000)
+    """每个 Bot 缓存的群信息数量"""
+    yunhu_group_cache_ttl: int = Field(300)
+    """群信息缓存有效期，秒，过期后仍返回旧值并在后台刷新"""
+    yunhu_startup_concurrency: int = Field(8)
+    """启动时同时获取 Bot 信息的最大请求数"""
+    yunhu_startup_timeout: float = Field(10)
+    """启动时获取单个 Bot 信息的超时时间，秒"""
+    yunhu_bot_info_snapshot: Optional[Path] = Field(None)
+    """Bot 信息快照文件路径，有快照的 Bot 启动时立即连接，最新信息在后台获取"""
+    yunhu_api_retries: int = Field(0)
+    """只读接口遇到连接错误、超时或 5xx 响应时的重试次数，重试复用已编码的请求体，
+    为 0 时不重试；发送、撤回、上传等接口不会重试"""
+    yunhu_api_retry_delay: float = Field(0.5)
+    """首次重试前的等待时间，秒，之后每次重试翻倍"""
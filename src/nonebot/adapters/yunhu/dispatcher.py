@@ -0,0 +1,230 @@
+import asyncio
+from typing import TYPE_CHECKING, Literal, Optional
+
+from nonebot.log import logger
+
+from .event import Event, MessageEvent
+from .lazy import LazyMessageEventDetail
+from .models import BaseNotice
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+QueuePolicy = Literal["block", "drop_oldest", "reject"]
+"""事件队列已满时的处理策略
+- block = 等待队列空出位置(webhook 响应随之变慢)
+- drop_oldest = 丢弃最早入队的事件
+- reject = 拒绝新事件，由 webhook 返回 503 让云湖重试
+"""
+
+Ordering = Literal["strict", "start"]
+"""同一会话内事件的顺序保证
+- strict = 前一个事件处理完毕后才处理下一个事件。
+  `got`/`reject`/`pause` 会结束本次处理、由临时事件响应器接收后续消息，不受影响；
+  在事件处理函数内直接等待同一会话后续消息的插件(如 nonebot-plugin-waiter)会一直等到超时
+- start = 仅按序预处理，事件响应器在独立任务中并发运行，
+  后到的消息可能先于前一条消息完成匹配与处理，供 waiter 类插件使用
+"""
+
+
+def chat_key(event: Event) -> Optional[str]:
+    """
+    获取事件所属会话的分片键
+
+    群聊使用群ID；单聊的 ``chatId`` 为机器人ID，因此改用对方用户ID。
+    无法确定会话的事件返回 ``None``。
+    """
+    detail = event.event
+    if isinstance(detail, LazyMessageEventDetail):
+        # 直接读取原始数据，不触发 sender 的校验
+        message = detail.raw["message"]
+        if message["chatType"] == "group":
+            return f"group:{message['chatId']}"
+        return f"user:{detail.raw['sender']['senderId']}"
+    if isinstance(event, MessageEvent):
+        if detail.message.chatType == "group":
+            return f"group:{detail.message.chatId}"
+        return f"user:{detail.sender.senderId}"
+    if isinstance(detail, BaseNotice):
+        if detail.chatType == "group":
+            return f"group:{detail.chatId}"
+        return f"user:{detail.userId}"
+    return None
+
+
+class EventDispatcher:
+    """
+    单个 Bot 的事件分发器
+
+    事件按会话分配到固定数量的分片，每个分片拥有一个有界队列和一个消费者协程：
+    同一会话内的事件按到达顺序处理(见 `Ordering`)，不同会话之间并发处理，
+    且突发流量下任务数量与事件循环延迟不会无限增长。
+    """
+
+    def __init__(
+        self,
+        bot: "Bot",
+        *,
+        queue_size: int,
+        workers: int,
+        policy: QueuePolicy = "block",
+        ordering: Ordering = "strict",
+    ):
+        if queue_size <= 0:
+            raise ValueError("queue_size must be positive")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self.bot = bot
+        self.policy: QueuePolicy = policy
+        self.ordering: Ordering = ordering
+        shard_size = -(-queue_size // workers)
+        self.shards: list[asyncio.Queue[Event]] = [
+            asyncio.Queue(maxsize=shard_size) for _ in range(workers)
+        ]
+        """分片队列，容量平分 ``queue_size``"""
+        self.dropped: int = 0
+        """drop_oldest 策略下被丢弃的事件数"""
+        self.rejected: int = 0
+        """reject 策略下被拒绝的事件数"""
+        self._workers: set[asyncio.Task] = set()
+        self._closed = asyncio.Event()
+        """是否已停止接收事件，等待入队的 webhook 请求会被唤醒并拒绝"""
+        self._handlers: set[asyncio.Task] = set()
+        """start 模式下运行事件响应器的任务"""
+        self._handler_slots = asyncio.Semaphore(queue_size)
+        """start 模式下同时运行的事件数上限，与队列总容量相同"""
+        self._next_shard = 0
+        self._in_flight = 0
+
+    @property
+    def depth(self) -> int:
+        """当前排队中的事件数"""
+        return sum(queue.qsize() for queue in self.shards)
+
+    def stats(self) -> dict[str, int]:
+        """队列统计信息，用于评估队列大小与分片数量"""
+        return {
+            "depth": self.depth,
+            "max_shard_depth": max(queue.qsize() for queue in self.shards),
+            "capacity": sum(queue.maxsize for queue in self.shards),
+            "workers": len(self._workers),
+            "in_flight": self._in_flight,
+            "handlers": len(self._handlers),
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+    def start(self) -> None:
+        """为每个分片启动消费者协程"""
+        if self._workers:
+            return
+        for queue in self.shards:
+            task = asyncio.create_task(self._worker(queue))
+            task.add_done_callback(self._workers.discard)
+            self._workers.add(task)
+
+    async def stop(self) -> None:
+        """停止所有消费者协程，未处理的事件将被丢弃"""
+        tasks = self._workers | self._handlers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _select_shard(self, event: Event) -> asyncio.Queue[Event]:
+        if (key := chat_key(event)) is not None:
+            return self.shards[hash(key) % len(self.shards)]
+        # 无会话的事件不需要保证顺序，轮流分配
+        self._next_shard = (self._next_shard + 1) % len(self.shards)
+        return self.shards[self._next_shard]
+
+    async def submit(self, event: Event) -> bool:
+        """
+        提交事件
+
+        :return: 事件是否被接受，``False`` 表示队列已满且策略为 reject，或分发器已关闭
+        """
+        if self._closed.is_set():
+            return False
+        queue = self._select_shard(event)
+
+        if self.policy == "block":
+            if not queue.full():
+                queue.put_nowait(event)
+                return True
+            # 关闭时唤醒等待中的请求，让 webhook 返回 503
+            put = asyncio.ensure_future(queue.put(event))
+            closed = asyncio.ensure_future(self._closed.wait())
+            try:
+                await asyncio.wait({put, closed}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                closed.cancel()
+                if not put.done():
+                    put.cancel()
+            return put.done() and not put.cancelled()
+
+        if self.policy == "drop_oldest":
+            while queue.full():
+                queue.get_nowait()
+                queue.task_done()
+                self.dropped += 1
+            queue.put_nowait(event)
+            return True
+
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        return True
+
+    async def join(self) -> None:
+        """等待所有已入队事件处理完毕"""
+        for queue in self.shards:
+            await queue.join()
+        while self._handlers:
+            await asyncio.wait(set(self._handlers))
+
+    async def drain(self, timeout: float) -> int:
+        """
+        在 ``timeout`` 秒内处理完已入队与处理中的事件，随后停止消费者协程
+
+        :return: 超时后被放弃的事件数(排队中与处理中)
+        """
+        self._closed.set()
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        abandoned = self.depth + self._in_flight
+        await self.stop()
+        return abandoned
+
+    async def _worker(self, queue: asyncio.Queue[Event]) -> None:
+        while True:
+            event = await queue.get()
+            self._in_flight += 1
+            try:
+                if self.ordering == "strict":
+                    await self.bot.handle_event(event)
+                else:
+                    await self.bot.prepare_event(event)
+                    await self._handler_slots.acquire()
+                    self._in_flight += 1
+                    task = asyncio.create_task(self._dispatch(event))
+                    self._handlers.add(task)
+                    task.add_done_callback(self._handlers.discard)
+            except Exception as e:
+                logger.error(f"Failed to handle event: {type(e)}, {e}")
+            finally:
+                self._in_flight -= 1
+                queue.task_done()
+
+    async def _dispatch(self, event: Event) -> None:
+        try:
+            await self.bot.dispatch_event(event)
+        except Exception as e:
+            logger.error(f"Failed to handle event: {type(e)}, {e}")
+        finally:
+            self._in_flight -= 1
+            self._handler_slots.release()
@@ -1,14 +1,19 @@
+from collections.abc import Awaitable
 from copy import deepcopy
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Literal, Optional
-from typing_extensions import override
+from typing import TYPE_CHECKING, Any, Callable, Literal, Optional
+from typing_extensions import Self, override
 
 from nonebot.adapters import Event as BaseEvent
-from nonebot.compat import model_dump
+from nonebot.compat import PYDANTIC_V2, model_dump
 from nonebot.utils import escape_tag
 
+if PYDANTIC_V2:
+    from pydantic import field_serializer
 
-from .message import Message
+
+from .lazy import LazyMessageEventDetail
+from .message import Message, MessageSegment
 from .models import (
     EventHeader,
     MessageEventDetail,
@@ -19,6 +24,16 @@ from .models import (
     TipNoticeDetail
 )
 
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+def _copy_segment(seg: MessageSegment) -> MessageSegment:
+    """复制消息段，``data`` 只含不可变值时浅复制即可，否则深复制"""
+    data = seg.data
+    if all(isinstance(value, _IMMUTABLE_TYPES) for value in data.values()):
+        return type(seg)(seg.type, data.copy())
+    return type(seg)(seg.type, deepcopy(data))
+
 
 class Event(BaseEvent):
     """
@@ -84,10 +99,60 @@ class MessageEvent(Event):
     :类型: ``bool``
     """
     reply: Optional[Reply] = None
+    """引用的机器人消息，开启 ``YUNHU_LAZY_REPLY`` 时需通过 `get_reply` 获取"""
 
     if TYPE_CHECKING:
         _message: Message
         original_message: Message
+        _reply: Reply
+        _reply_resolver: Callable[[], Awaitable[Reply]]
+
+    if PYDANTIC_V2:
+
+        @field_serializer("event", mode="wrap")
+        def _serialize_event(self, value: Any, handler: Any) -> Any:
+            # 延迟校验的事件在序列化时才完整校验
+            if isinstance(value, LazyMessageEventDetail):
+                value = value.materialize()
+            return handler(value)
+
+    else:
+
+        class Config:
+            json_encoders = {
+                LazyMessageEventDetail: lambda detail: detail.materialize().dict()
+            }
+
+    async def get_reply(self) -> Optional[Reply]:
+        """
+        获取引用的消息
+
+        与 ``reply`` 不同，被引用的消息不是机器人发送的也会返回；
+        首次调用时才请求接口，结果会被缓存。未引用消息时返回 ``None``
+        """
+        if self.reply is not None:
+            return self.reply
+        if not hasattr(self, "_reply"):
+            if (resolver := getattr(self, "_reply_resolver", None)) is None:
+                return None
+            setattr(self, "_reply", await resolver())
+        return self._reply
+
+    @classmethod
+    def construct_lazy(cls, json_data: dict[str, Any]) -> Self:
+        """
+        构造延迟校验的消息事件
+
+        仅校验 ``header``，``event`` 为 `LazyMessageEventDetail`，
+        其中的 ``sender``、``message.content`` 等在首次访问时才校验。
+        """
+        header = EventHeader(**json_data["header"])
+        detail = LazyMessageEventDetail(json_data["event"])
+        if PYDANTIC_V2:
+            return cls.model_construct(
+                version=json_data["version"], header=header, event=detail
+            )
+        return cls.construct(version=json_data["version"], header=header, event=detail)
 
     @override
     def get_type(self) -> Literal["message"]:
@@ -99,6 +164,14 @@ class MessageEvent(Event):
 
     @override
     def get_event_description(self) -> str:
+        if isinstance(self.event, LazyMessageEventDetail):
+            # 日志直接使用原始文本，避免在匹配前触发校验与反序列化
+            text = self.event.message.raw["content"].get("text", "")
+            return (
+                f"Message {self.event.message.msgId} from {self.get_user_id()}"
+                f"@[{self.event.message.chatType}:{self.get_user_id()}]"
+                f" '{escape_tag(str(text))}'"
+            )
         return (
             f"Message {self.event.message.msgId} from {self.get_user_id()}"
             f"@[{self.event.message.chatType}:{self.event.sender.senderId}]"
@@ -122,7 +195,7 @@ class MessageEvent(Event):
             setattr(
                 self,
                 "original_message",
-                deepcopy(deserialized),
+                Message(_copy_segment(seg) for seg in deserialized),
             )
 
         return getattr(self, "_message")
@@ -137,6 +210,8 @@ class MessageEvent(Event):
 
     @override
     def get_user_id(self) -> str:
+        if isinstance(self.event, LazyMessageEventDetail):
+            return self.event.raw["sender"]["senderId"]
         return self.event.sender.senderId
 
     @override
@@ -44,11 +44,13 @@ class NetworkError(BaseNetworkError, YunHuAdapterException):
     :参数:
 
       * ``retcode: Optional[int]``: 错误码
+      * ``status_code: Optional[int]``: HTTP 状态码，未收到响应时为 ``None``
     """
 
-    def __init__(self, msg: Optional[str] = None):
+    def __init__(self, msg: Optional[str] = None, status_code: Optional[int] = None):
         super().__init__()
         self.msg = msg
+        self.status_code = status_code
 
     def __repr__(self):
         return f"<NetWorkError message={self.msg}>"
@@ -0,0 +1,148 @@
+from typing import Annotated, Any, Optional
+
+from pydantic import Field
+
+from .models import Chat, Content, EventMessage, MessageEventDetail, Sender
+from .models.common import _fill_message_content_type
+from .validators import get_validator, type_validate
+
+_validate_content = get_validator(
+    Annotated[Content, Field(discriminator="contentType")]  # type: ignore
+)
+
+_MESSAGE_KEYS = ("msgId", "chatId", "chatType", "contentType", "content", "sendTime")
+"""分发前直接从原始数据读取的消息字段"""
+_SENDER_KEYS = ("senderId", "senderNickname")
+"""分发前直接从原始数据读取的发送者字段"""
+
+
+def has_lazy_fields(raw: Any) -> bool:
+    """
+    检查分发前直接读取的原始字段是否齐全
+
+    不齐全的事件应完整校验，由校验报告错误，而不是在分发过程中抛出 ``KeyError``
+    """
+    if not isinstance(raw, dict):
+        return False
+    message = raw.get("message")
+    sender = raw.get("sender")
+    return (
+        isinstance(message, dict)
+        and isinstance(sender, dict)
+        and isinstance(message.get("content"), dict)
+        and all(key in message for key in _MESSAGE_KEYS)
+        and all(key in sender for key in _SENDER_KEYS)
+    )
+
+
+class LazyEventMessage:
+    """
+    延迟校验的 `EventMessage` 视图
+
+    标量字段直接读取原始数据，``content`` 在首次访问时才校验为对应的消息内容模型。
+    字段含义参考 `EventMessage`。
+    """
+
+    __slots__ = ("_content", "_raw")
+
+    def __init__(self, raw: dict[str, Any]):
+        self._raw = _fill_message_content_type(raw)
+        self._content: Optional[Content] = None
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """原始消息数据"""
+        return self._raw
+
+    @property
+    def msgId(self) -> str:
+        return self._raw["msgId"]
+
+    @property
+    def parentId(self) -> Optional[str]:
+        return self._raw.get("parentId")
+
+    @property
+    def sendTime(self) -> int:
+        return self._raw["sendTime"]
+
+    @property
+    def chatId(self) -> str:
+        return self._raw["chatId"]
+
+    @property
+    def chatType(self) -> str:
+        return self._raw["chatType"]
+
+    @property
+    def contentType(self) -> str:
+        return self._raw["contentType"]
+
+    @property
+    def commandId(self) -> Optional[int]:
+        return self._raw.get("commandId")
+
+    @property
+    def commandName(self) -> Optional[str]:
+        return self._raw.get("commandName")
+
+    @property
+    def content(self) -> Content:
+        if self._content is None:
+            self._content = _validate_content(self._raw["content"])
+        return self._content
+
+    def materialize(self) -> EventMessage:
+        """完整校验为 `EventMessage`"""
+        return type_validate(EventMessage, self._raw)
+
+
+class LazyMessageEventDetail:
+    """
+    延迟校验的 `MessageEventDetail` 视图
+
+    ``sender``、``chat`` 与 ``message.content`` 均在首次访问时才进行校验，
+    只读取事件类型、会话ID等字段的匹配器无需承担完整校验的开销。
+    序列化所在的事件时会先完整校验为 `MessageEventDetail`。
+    """
+
+    __slots__ = ("_chat", "_message", "_raw", "_sender")
+
+    def __init__(self, raw: dict[str, Any]):
+        self._raw = raw
+        self._sender: Optional[Sender] = None
+        self._chat: Optional[Chat] = None
+        self._message: Optional[LazyEventMessage] = None
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """原始事件数据"""
+        return self._raw
+
+    @property
+    def sender(self) -> Sender:
+        if self._sender is None:
+            self._sender = type_validate(Sender, self._raw["sender"])
+        return self._sender
+
+    @property
+    def chat(self) -> Chat:
+        if self._chat is None:
+            self._chat = type_validate(Chat, self._raw["chat"])
+        return self._chat
+
+    @property
+    def message(self) -> LazyEventMessage:
+        if self._message is None:
+            self._message = LazyEventMessage(self._raw["message"])
+        return self._message
+
+    def materialize(self) -> MessageEventDetail:
+        """完整校验为 `MessageEventDetail`"""
+        return type_validate(MessageEventDetail, self._raw)
+
+    def __repr__(self) -> str:
+        return f"LazyMessageEventDetail({self._raw!r})"
+
+
+__all__ = ["LazyEventMessage", "LazyMessageEventDetail", "has_lazy_fields"]
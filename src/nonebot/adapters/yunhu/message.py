@@ -7,7 +7,8 @@ from typing_extensions import override
 from nonebot.adapters import Message as BaseMessage
 from nonebot.adapters import MessageSegment as BaseMessageSegment
 from nonebot.log import logger
-from .tool import YUNHU_EMOJI_MAP, _EMOJI_PATTERN
+from .tool import _EMOJI_BY_CODE, _EMOJI_PATTERN
+from .tool import encode_emoji as _encode_emoji
 from .models.common import (
     ButtonBody,
     Content,
@@ -255,6 +256,54 @@ class Face(MessageSegment):
         return f"[face:code={self.data['code']}]"
 
 
+_AT_PATTERN = re.compile(r"@(?P<name>[^@\u200b\s]+)\s*\u200b")
+"""@ 提及，形如 ``@昵称 \u200b``"""
+_TEXT_TOKEN_PATTERN = re.compile(f"{_AT_PATTERN.pattern}|{_EMOJI_PATTERN.pattern}")
+"""@ 提及或表情，一次扫描同时切分两者"""
+
+
+def _parse_text(
+    msg: "Message",
+    text: str,
+    at_list: Optional[list[str]],
+    pattern: re.Pattern[str],
+) -> None:
+    """
+    单次扫描文本，依次追加 Text/At/Face 消息段
+
+    同一昵称多次出现时对应同一用户，不同昵称按顺序对应 ``at_list`` 中的用户ID
+    """
+    at_name_mapping: dict[str, str] = {}
+    at_index = 0
+    pos = 0
+    for token in pattern.finditer(text):
+        segment: Optional[MessageSegment]
+        if token.lastgroup == "code":
+            code = token["code"]
+            if (emoji := _EMOJI_BY_CODE.get(code)) is None:
+                # 未知表情留在文本中
+                continue
+            segment = Face("face", {"code": code, "emoji": emoji})
+        else:
+            user_name = token["name"]
+            if (user_id := at_name_mapping.get(user_name)) is None:
+                user_id = ""
+                if at_list and at_index < len(at_list):
+                    user_id = at_name_mapping[user_name] = at_list[at_index]
+                    at_index += 1
+            # 无法对应到用户的 @ 直接丢弃
+            segment = (
+                At("at", {"user_id": user_id, "name": user_name}) if user_id else None
+            )
+        if token.start() > pos:
+            msg.append(Text("text", {"text": text[pos : token.start()]}))
+        pos = token.end()
+        if segment is not None:
+            msg.append(segment)
+    if pos < len(text):
+        msg.append(Text("text", {"text": text[pos:]}))
+
+
 class Message(BaseMessage[MessageSegment]):
     """
     云湖 协议 Message 适配。
@@ -286,101 +335,101 @@ class Message(BaseMessage[MessageSegment]):
     def _construct(msg: str) -> Iterable[MessageSegment]:
         yield Text("text", {"text": msg})
 
-    def serialize(self) -> tuple[dict[str, Any], str]:
-        # sourcery skip: dict-assign-update-to-union
+    def serialize(self, encode_emoji: bool = False) -> tuple[dict[str, Any], str]:
         """
         序列化消息为协议内容
+
+        :param encode_emoji: 按 ``text`` 发送时将文本中的字符emoji转为云湖表情 ``[.<code>]``
+
+        单次遍历对消息段分类：
+        - 仅有 Text/At/Face 时按 ``text`` 发送
+        - 包含 Markdown/Html 时整体按该类型发送
+        - 图片与其他内容混排(或多张图片)时转为 ``markdown``
+        - 仅有单个图片/视频/文件时按该类型发送
+
+        按钮作为附件挂在 ``buttons`` 上，不影响内容类型；语音不支持发送，会被忽略。
         """
         if not self:
             raise ValueError("Empty message")
 
-        result: dict[str, Any] = {"at": []}
-
-        # 不支持语音发送
-        if "audio" in self:
-            logger.warning("Sending audio is not supported")
-            self.exclude("audio")
-
-        # 按钮单独挂在 result 上
-        if "buttons" in self:
-            result["buttons"] = []
-            for seg in self["buttons"]:
-                result["buttons"].extend(seg.data["buttons"])
-
-        # 只包含 Text / At / Face 的消息，统一走纯文本通道
-        if all(isinstance(seg, (Text, At, Face)) for seg in self):
-            text_buffer: list[str] = []
-            last_text_type: str | None = None
-
-            for seg in self:
-                if isinstance(seg, At):
-                    result["at"].append(seg.data["user_id"])
-                    text_buffer.append(f"@{seg.data['name']}\u200b")
-                elif isinstance(seg, Face):
-                    # 按协议要求转回 [.<code>]
-                    text_buffer.append(f"[.{seg.data['code']}]\u200b")
-                elif isinstance(seg, Text):
-                    text_buffer.append(seg.data["text"])
-                    last_text_type = seg.type
-
-            result["text"] = "".join(text_buffer)
-            return result, last_text_type or "text"
-
-        # 包含图片且消息段大于1，转为md发送
-        if len(self) > 1 and self.has("image"):
-            return self._build_markdown_message(result)
-        # 其它混合类型（只有单图/视频/文件）
+        at: list[str] = []
+        buttons: list[list[ButtonBody]] = []
         text_parts: list[str] = []
-        message_type: Optional[str] = None
+        """按 text 发送时的内容，表情转回 [.<code>]"""
+        rich_parts: list[str] = []
+        """按 markdown/html 发送时的内容，表情转为字符，图片转为 markdown 语法"""
+        rich_type: Optional[str] = None
+        media: list[MessageSegment] = []
+        has_text = has_image = False
 
         for seg in self:
-            if isinstance(seg, At):
-                result["at"].append(seg.data["user_id"])
-                text_parts.append(seg.data["name"] + "\u200b")
-            elif isinstance(seg, (Markdown, Html)):
-                text_parts.append(seg.data["text"])
-                message_type = seg.type
-            else:
-                # 非文本段的数据直接合并到 result
-                result.update(seg.data)
-                message_type = seg.type
-
-        result["text"] = "".join(text_parts)
-        return result, message_type or "text"
-
-    def _build_markdown_message(
-        self, result: dict[str, Any]
-    ) -> tuple[dict[str, Any], str]:
-        md_parts: list[str] = []
-
-        for seg in self:
-            if isinstance(seg, At):
-                # at 仍然单独放到 result["at"]，markdown 里按普通文本输出
-                result["at"].append(seg.data["user_id"])
-                name = seg.data["name"] or seg.data["user_id"]
-                md_parts.append(f"@{name}\u200b")
-            elif isinstance(seg, Face):
-                # 表情转成字符
-                md_parts.append(seg.data["emoji"])
-            elif seg.is_text():
-                md_parts.append(seg.data["text"])
-            elif isinstance(seg, Image):
-                if image_url := seg.data["url"]:
-                    # 普通 markdown 图片语法，src 由云湖解释
-                    md_parts.append(f"![image]({image_url})\n")
-            else:
-                # 文件、视频等不进 markdown 混排，忽略或以后按需扩展
-                logger.debug(
-                    "Ignore non-image segment in markdown mixed message: %r", seg
+            data = seg.data
+            match seg.type:
+                case "text":
+                    text_parts.append(
+                        _encode_emoji(data["text"]) if encode_emoji else data["text"]
+                    )
+                    rich_parts.append(data["text"])
+                    has_text = True
+                case "at":
+                    at.append(data["user_id"])
+                    text_parts.append(f"@{data['name']}\u200b")
+                    rich_parts.append(f"@{data['name'] or data['user_id']}\u200b")
+                    has_text = True
+                case "face":
+                    # 按协议要求转回 [.<code>]
+                    text_parts.append(f"[.{data['code']}]\u200b")
+                    rich_parts.append(data["emoji"])
+                    has_text = True
+                case "markdown" | "html":
+                    text_parts.append(data["text"])
+                    rich_parts.append(data["text"])
+                    rich_type = seg.type
+                    has_text = True
+                case "buttons":
+                    buttons.extend(data["buttons"])
+                case "audio":
+                    logger.warning("Sending audio is not supported")
+                case _:
+                    media.append(seg)
+                    if seg.type == "image":
+                        has_image = True
+                        if image_url := data["url"]:
+                            # 普通 markdown 图片语法，src 由云湖解释
+                            rich_parts.append(f"![image]({image_url})\n")
+
+        if not (has_text or media or buttons):
+            raise ValueError("Cannot serialize message: no sendable content")
+
+        result: dict[str, Any] = {"at": at}
+        if buttons:
+            result["buttons"] = buttons
+
+        if has_image and (has_text or len(media) > 1):
+            # 图片混排转为 markdown，文件、视频等无法混排，忽略
+            if len(media) > sum(seg.type == "image" for seg in media):
+                logger.debug("Ignore non-image segment in markdown mixed message")
+            md_text = "".join(rich_parts).strip()
+            if not md_text:
+                # 与其构造空 markdown，不如显式抛错提示调用方
+                raise ValueError(
+                    "Cannot serialize image message: no renderable content"
                 )
+            result["text"] = md_text
+            return result, "markdown"
 
-        md_text = "".join(md_parts).strip()
-        if not md_text:
-            # 与其构造空 markdown，不如显式抛错提示调用方
-            raise ValueError("Cannot serialize image message: no renderable content")
+        if media:
+            # 单个媒体，或视频/文件与文本混排时只能发送最后一个媒体
+            result.update(media[-1].data)
+            result["text"] = "".join(text_parts)
+            return result, media[-1].type
 
-        result["text"] = md_text
-        return result, "markdown"
+        if rich_type:
+            result["text"] = "".join(rich_parts)
+            return result, rich_type
+
+        result["text"] = "".join(text_parts)
+        return result, "text"
 
     @staticmethod
     def deserialize(
@@ -407,72 +456,16 @@ class Message(BaseMessage[MessageSegment]):
         msg = Message(f"{command_name} ") if command_name else Message()
         parsed_content = content.to_dict()
 
-        def _split_face_segments(segment: str) -> list[MessageSegment]:
-            """将文本分割为 Text/Face 段列表"""
-            segments: list[MessageSegment] = []
-            last_end = 0
-            for match in _EMOJI_PATTERN.finditer(segment):
-                if match.start() > last_end:
-                    normal_text = segment[last_end : match.start()]
-                    if normal_text:
-                        segments.append(MessageSegment.text(normal_text))
-                emoji_code = match.group(0)
-                clean_code = emoji_code.lstrip("[").rstrip("]").lstrip(".")
-                emoji_value = YUNHU_EMOJI_MAP.get(emoji_code)
-                if emoji_value:
-                    segments.append(MessageSegment.face(clean_code, emoji_value))
-                last_end = match.end()
-            if last_end < len(segment):
-                normal_text = segment[last_end:]
-                if normal_text:
-                    segments.append(MessageSegment.text(normal_text))
-            return segments
-
-        def parse_text(text: str, with_face: bool = False):
-            # 优化性能：只正则一次，分割@和普通文本
-            at_pattern = re.compile(r"@(?P<name>[^@\u200b\s]+)\s*\u200b")
-            at_name_mapping = {}
-            at_index = 0
-            pos = 0
-            for embed in at_pattern.finditer(text):
-                # 处理@前的文本
-                segment = text[pos : embed.start()]
-                if segment:
-                    if with_face:
-                        msg.extend(Message(_split_face_segments(segment)))
-                    else:
-                        msg.append(MessageSegment.text(segment))
-                # 处理@本身
-                user_name = embed.group("name")
-                if user_name in at_name_mapping:
-                    actual_user_id = at_name_mapping[user_name]
-                else:
-                    actual_user_id = ""
-                    if at_list and at_index < len(at_list):
-                        actual_user_id = at_list[at_index]
-                        at_name_mapping[user_name] = actual_user_id
-                        at_index += 1
-                if actual_user_id:
-                    msg.append(MessageSegment.at(actual_user_id, user_name))
-                pos = embed.end()
-            # 处理最后一段文本
-            segment = text[pos:]
-            if segment:
-                if with_face:
-                    msg.extend(Message(_split_face_segments(segment)))
-                else:
-                    msg.append(MessageSegment.text(segment))
-
         match message_type:
             case "text":
                 assert isinstance(content, TextContent)
-                parse_text(content.text, with_face=True)
+                _parse_text(msg, content.text, at_list, _TEXT_TOKEN_PATTERN)
             case "markdown":
                 assert isinstance(content, MarkdownContent)
-                parse_text(content.text)
+                _parse_text(msg, content.text, at_list, _AT_PATTERN)
             case "html":
                 assert isinstance(content, HTMLContent)
-                parse_text(content.text)
+                _parse_text(msg, content.text, at_list, _AT_PATTERN)
             case _:
                 parsed_content.pop("at", None)
                 if seg_builder := getattr(MessageSegment, message_type, None):
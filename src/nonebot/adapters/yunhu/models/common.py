@@ -241,6 +241,31 @@ Content = Union[
 ]
 
 
+def _fill_message_content_type(values: dict[str, Any]) -> dict[str, Any]:
+    """
+    在解析前确保 content 内包含 contentType（discriminator 需要）。
+    优先使用外层 contentType；若不存在则根据 content 字段特征启发式推断。
+    """
+    content = values.get("content")
+    if not content:
+        return values  # 如果已经有内层 contentType，保证外层一致或回填外层
+    if "contentType" in content:
+        values.setdefault("contentType", content["contentType"])
+        return values
+
+    # 如果有外层 contentType，则填充到 content 中
+    if ct := values.get("contentType"):
+        if ct == "expression":
+            content = {"contentType": "image", **content}
+            values["content"] = content
+            values["contentType"] = "image"
+        else:
+            content = {"contentType": ct, **content}
+            values["content"] = content
+
+    return values
+
+
 class EventMessage(BaseModel):
     msgId: str
     """消息ID,全局唯一"""
@@ -272,28 +297,7 @@ class EventMessage(BaseModel):
 
     @model_validator(mode="before")
     def _fill_content_type(cls, values: dict[str, Any]) -> dict[str, Any]:
-        """
-        在解析前确保 content 内包含 contentType（discriminator 需要）。
-        优先使用外层 contentType；若不存在则根据 content 字段特征启发式推断。
-        """
-        content = values.get("content")
-        if not content:
-            return values  # 如果已经有内层 contentType，保证外层一致或回填外层
-        if "contentType" in content:
-            values.setdefault("contentType", content["contentType"])
-            return values
-
-        # 如果有外层 contentType，则填充到 content 中
-        if ct := values.get("contentType"):
-            if ct == "expression":
-                content = {"contentType": "image", **content}
-                values["content"] = content
-                values["contentType"] = "image"
-            else:
-                content = {"contentType": ct, **content}
-                values["content"] = content
-
-        return values
+        return _fill_message_content_type(values)
 
 
 class MessageEventDetail(BaseModel):
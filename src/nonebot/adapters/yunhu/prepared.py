@@ -0,0 +1,41 @@
+from typing import Any, Literal, Optional
+
+from .codec import JSONCodec
+
+
+class PreparedMessage:
+    """
+    已上传资源、序列化并编码好的消息，用于向大量对象发送同一条消息
+
+    通过 `Bot.prepare_message` 创建，`Bot.send_prepared` 发送。
+    ``content`` 与 ``contentType`` 只编码一次，发送时仅编码接收对象等少量字段并拼接到请求体中。
+    """
+
+    __slots__ = ("_body", "codec", "content", "content_type")
+
+    def __init__(self, content: dict[str, Any], content_type: str, codec: JSONCodec):
+        self.content = content
+        """序列化后的消息内容，不应再修改"""
+        self.content_type = content_type
+        """消息类型"""
+        self.codec = codec
+        self._body = codec.dumps({"content": content, "contentType": content_type})
+
+    def encode(
+        self,
+        receive_id: str,
+        receive_type: Literal["group", "user"],
+        parent_id: Optional[str] = None,
+    ) -> bytes:
+        """编码 `bot/send` 的请求体"""
+        head = self.codec.dumps(
+            {"recvId": receive_id, "recvType": receive_type, "parentId": parent_id}
+        )
+        # 两个 JSON 对象合并：去掉前者的 "}" 与后者的 "{"
+        return b"".join((head[:-1], b",", self._body[1:]))
+
+    def __repr__(self) -> str:
+        return f"PreparedMessage({self.content_type}, {len(self._body)} bytes)"
+
+
+__all__ = ["PreparedMessage"]
@@ -0,0 +1,66 @@
+from pathlib import Path
+import time
+from typing import NamedTuple, Union
+
+from .codec import JSONCodec, get_json_codec
+
+
+class WebhookRecord(NamedTuple):
+    """一条录制的 webhook 请求"""
+
+    ts: float
+    """收到请求的时间戳，秒"""
+    app_id: str
+    """接收请求的机器人ID"""
+    body: bytes
+    """原始请求体"""
+
+
+class WebhookRecorder:
+    """
+    webhook 流量录制器
+
+    每个请求体连同时间戳与机器人ID写为 JSONL 的一行：
+    ``{"ts": 1700000000.0, "app_id": "123", "body": "<原始请求体>"}``
+    """
+
+    def __init__(self, path: Union[str, Path], codec: JSONCodec):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.count: int = 0
+        """已录制的请求数"""
+        self._file = self.path.open("ab")
+
+    def record(self, app_id: str, body: Union[str, bytes]) -> None:
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        self._file.write(
+            self.codec.dumps({"ts": time.time(), "app_id": app_id, "body": body})
+            + b"\n"
+        )
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def load_records(
+    path: Union[str, Path], codec: Union[JSONCodec, None] = None
+) -> list[WebhookRecord]:
+    """读取录制文件，按时间戳排序"""
+    codec = codec or get_json_codec()
+    records: list[WebhookRecord] = []
+    with Path(path).open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = codec.loads(line)
+            records.append(
+                WebhookRecord(data["ts"], data["app_id"], data["body"].encode("utf-8"))
+            )
+    records.sort(key=lambda record: record.ts)
+    return records
+
+
+__all__ = ["WebhookRecord", "WebhookRecorder", "load_records"]
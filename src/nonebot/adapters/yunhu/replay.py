@@ -0,0 +1,356 @@
+"""
+webhook 流量离线回放
+
+将 `WebhookRecorder` 录制的请求按原速、N 倍速或最大吞吐量重新送入进程内的适配器，
+API 调用由 `ReplayDriver` 直接返回伪造的成功响应，不会访问云湖。
+
+    python -m nonebot.adapters.yunhu.replay record.jsonl --speed 10
+    python -m nonebot.adapters.yunhu.replay record.jsonl --max
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import time
+import tracemalloc
+from typing import Any, Optional
+import uuid
+
+import nonebot
+from nonebot.config import Env
+from nonebot.drivers import (
+    ASGIMixin,
+    HTTPClientMixin,
+    HTTPClientSession,
+    HTTPServerSetup,
+    Request,
+    Response,
+    WebSocketServerSetup,
+)
+from nonebot.drivers.none import Driver as NoneDriver
+
+from .adapter import Adapter
+from .bot import Bot
+from .codec import get_json_codec
+from .config import YunHuConfig
+from .recorder import WebhookRecord, load_records
+
+
+class ReplayDriver(NoneDriver, ASGIMixin, HTTPClientMixin):
+    """
+    回放用驱动器
+
+    不启动任何服务器，所有 HTTP 请求直接返回伪造的成功响应，
+    可通过 ``api_latency`` 模拟接口延迟。
+    """
+
+    def __init__(self, *args: Any, api_latency: float = 0.0, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.api_latency = api_latency
+        self.api_calls: Counter[str] = Counter()
+        """按路径统计的 API 调用次数"""
+        self.codec = get_json_codec()
+
+    @property
+    def type(self) -> str:
+        return "replay"
+
+    @property
+    def server_app(self) -> Any:
+        return None
+
+    @property
+    def asgi(self) -> Any:
+        return None
+
+    def setup_http_server(self, setup: HTTPServerSetup) -> None:
+        pass
+
+    def setup_websocket_server(self, setup: WebSocketServerSetup) -> None:
+        pass
+
+    def get_session(self, *args: Any, **kwargs: Any) -> HTTPClientSession:
+        raise NotImplementedError("ReplayDriver does not support sessions")
+
+    def _fake_data(self, path: str, request: Request) -> dict[str, Any]:
+        body = self.codec.loads(request.content) if request.content else {}
+        if path.endswith("bot/bot-info"):
+            return {
+                "bot": {
+                    "id": 0,
+                    "botId": body["botId"],
+                    "nickname": f"replay-{body['botId']}",
+                    "nicknameId": 0,
+                    "avatarId": 0,
+                    "avatarUrl": "",
+                    "token": "",
+                    "link": "",
+                    "introduction": "",
+                    "createBy": "",
+                    "createTime": 0,
+                    "headcount": 0,
+                    "private": 0,
+                    "uri": "",
+                }
+            }
+        if path.endswith("bot/send"):
+            return {
+                "messageInfo": {
+                    "msgId": uuid.uuid4().hex,
+                    "recvId": body.get("recvId", ""),
+                    "recvType": body.get("recvType", "user"),
+                }
+            }
+        if path.endswith("bot/messages"):
+            return {
+                "list": [
+                    {
+                        "msgId": request.url.query.get("message-id", ""),
+                        "parentId": "",
+                        "senderId": "replay",
+                        "senderType": "user",
+                        "senderNickname": "replay",
+                        "contentType": "text",
+                        "content": {"text": "replay"},
+                        "sendTime": 0,
+                    }
+                ]
+            }
+        if path.endswith("user/homepage"):
+            return {
+                "user": {
+                    "userId": request.url.query.get("userId", ""),
+                    "nickname": "replay",
+                    "avatarUrl": "",
+                    "registerTime": 0,
+                    "registerTimeText": "",
+                    "onLineDay": 0,
+                    "continuousOnLineDay": 0,
+                    "medals": [],
+                    "isVip": 0,
+                }
+            }
+        if path.endswith("group/group-info"):
+            return {
+                "group": {
+                    "id": 0,
+                    "groupId": body.get("groupId", ""),
+                    "name": "replay",
+                    "introduction": "",
+                    "createBy": "",
+                    "createTime": 0,
+                    "avatarId": 0,
+                    "avatarUrl": "",
+                    "headcount": 0,
+                    "readHistory": 0,
+                    "category": "",
+                    "uri": "",
+                }
+            }
+        return {
+            "successCount": 1,
+            "imageKey": "replay",
+            "videoKey": "replay",
+            "fileKey": "replay",
+        }
+
+    async def request(self, setup: Request) -> Response:
+        path = setup.url.path
+        self.api_calls[path] += 1
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+        return Response(
+            200,
+            headers={"Content-Type": "application/json"},
+            content=self.codec.dumps(
+                {"code": 1, "msg": "success", "data": self._fake_data(path, setup)}
+            ),
+            request=setup,
+        )
+
+    async def stream_request(
+        self, setup: Request, *, chunk_size: int = 1024
+    ) -> AsyncGenerator[Response, None]:
+        yield await self.request(setup)
+
+
+@dataclass
+class ReplayReport:
+    """回放结果"""
+
+    requests: int
+    """送入的 webhook 请求数"""
+    handled: int
+    """处理完成的事件数"""
+    elapsed: float
+    """从第一个请求到所有事件处理完成的耗时，秒"""
+    latencies: list[float] = field(repr=False)
+    """每个事件从送入到处理完成的耗时，秒"""
+    status_codes: dict[int, int] = field(default_factory=dict)
+    """webhook 响应状态码统计"""
+    api_calls: dict[str, int] = field(default_factory=dict)
+    """按路径统计的 API 调用次数"""
+    peak_memory: Optional[int] = None
+    """回放期间的内存峰值，字节"""
+
+    @property
+    def events_per_second(self) -> float:
+        return self.handled / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """分发延迟的百分位数，秒"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def __str__(self) -> str:
+        lines = [
+            f"requests:   {self.requests} {dict(self.status_codes)}",
+            f"handled:    {self.handled} in {self.elapsed:.3f}s "
+            f"({self.events_per_second:.1f} events/s)",
+            f"latency:    p50 {self.percentile(50) * 1000:.2f}ms "
+            f"p99 {self.percentile(99) * 1000:.2f}ms",
+            f"api calls:  {sum(self.api_calls.values())} {dict(self.api_calls)}",
+        ]
+        if self.peak_memory is not None:
+            lines.append(f"peak mem:   {self.peak_memory / 1024 / 1024:.2f} MiB")
+        return "\n".join(lines)
+
+
+@asynccontextmanager
+async def replay_adapter(
+    app_ids: Sequence[str], *, api_latency: float = 0.0
+) -> AsyncGenerator[Adapter, None]:
+    """
+    创建连接到 `ReplayDriver` 的进程内适配器，并为每个 app_id 连接一个 Bot
+
+    需要先调用 ``nonebot.init()``，退出时执行适配器的优雅关闭。
+    """
+    base = nonebot.get_driver()
+    driver = ReplayDriver(
+        Env(environment=base.env), base.config, api_latency=api_latency
+    )
+    adapter = Adapter(driver)
+    adapter.recorder = None
+    adapter.configs.yunhu_bots = [
+        YunHuConfig(app_id=app_id, token="replay") for app_id in app_ids
+    ]
+    await adapter.startup()
+    try:
+        yield adapter
+    finally:
+        await adapter.shutdown()
+
+
+async def replay(
+    records: Sequence[WebhookRecord],
+    *,
+    speed: Optional[float] = 1.0,
+    api_latency: float = 0.0,
+    trace_memory: bool = True,
+) -> ReplayReport:
+    """
+    回放录制的 webhook 请求
+
+    :param records: 录制的请求，需按时间戳排序
+    :param speed: 回放倍速，``None`` 时不等待，以最大吞吐量送入
+    :param api_latency: 模拟的 API 延迟，秒
+    :param trace_memory: 是否使用 tracemalloc 统计内存峰值(会降低吞吐量)
+    """
+    codec = get_json_codec()
+    event_ids = [Adapter._get_event_id(codec.loads(r.body)) for r in records]
+    feed_times: dict[str, float] = {}
+    latencies: list[float] = []
+    status_codes: Counter[int] = Counter()
+
+    def instrument(bot: Bot) -> None:
+        dispatch_event = bot.dispatch_event
+
+        async def timed_dispatch_event(event: Any) -> None:
+            try:
+                await dispatch_event(event)
+            finally:
+                if (start := feed_times.pop(event.header.eventId, None)) is not None:
+                    latencies.append(time.perf_counter() - start)
+
+        bot.dispatch_event = timed_dispatch_event  # type: ignore
+
+    app_ids = sorted({record.app_id for record in records})
+    async with replay_adapter(app_ids, api_latency=api_latency) as adapter:
+        for bot in adapter.bots.values():
+            instrument(bot)  # type: ignore
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        base_ts = records[0].ts if records else 0.0
+        for record, event_id in zip(records, event_ids):
+            if speed:
+                delay = (record.ts - base_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if event_id:
+                feed_times[event_id] = time.perf_counter()
+            response = await adapter._handle_http(
+                Request(
+                    "POST",
+                    f"http://replay/yunhu/{record.app_id}",
+                    content=record.body,
+                )
+            )
+            status_codes[response.status_code] += 1
+        for dispatcher in adapter.dispatchers.values():
+            await dispatcher.join()
+        elapsed = time.perf_counter() - start
+        peak_memory = None
+        if trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        api_calls = dict(adapter.driver.api_calls)  # type: ignore
+
+    return ReplayReport(
+        requests=len(records),
+        handled=len(latencies),
+        elapsed=elapsed,
+        latencies=latencies,
+        status_codes=dict(status_codes),
+        api_calls=api_calls,
+        peak_memory=peak_memory,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m nonebot.adapters.yunhu.replay",
+        description="Replay recorded YunHu webhook traffic against an in-process adapter",
+    )
+    parser.add_argument("path", help="recording file written by YUNHU_RECORD_PATH")
+    pace = parser.add_mutually_exclusive_group()
+    pace.add_argument("--speed", type=float, default=1.0, help="replay speed factor")
+    pace.add_argument("--max", action="store_true", help="replay at max throughput")
+    parser.add_argument(
+        "--api-latency", type=float, default=0.0, help="simulated API latency (s)"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip tracemalloc peak memory"
+    )
+    args = parser.parse_args(argv)
+
+    nonebot.init(driver="~none")
+    report = asyncio.run(
+        replay(
+            load_records(args.path),
+            speed=None if args.max else args.speed,
+            api_latency=args.api_latency,
+            trace_memory=not args.no_memory,
+        )
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
+from collections.abc import Iterable
 import re
+from typing import Any
+
 from nonebot.drivers import HTTPClientMixin, Request, Response
 from nonebot.adapters import Adapter
 
@@ -122,7 +125,76 @@ YUNHU_EMOJI_MAP = {
 # 预先计算表情 key 列表与匹配正则，避免在 decode_emoji 中重复构建
 # 按长度降序，防止短 key 优先匹配并截断长 key
 _EMOJI_KEYS = sorted(YUNHU_EMOJI_MAP.keys(), key=len, reverse=True)
-_EMOJI_PATTERN = re.compile("|".join(re.escape(k) for k in _EMOJI_KEYS))
+_EMOJI_BY_CODE = {key[2:-1]: emoji for key, emoji in YUNHU_EMOJI_MAP.items()}
+"""表情码(不含 ``[.`` 与 ``]``) -> 字符emoji"""
+_EMOJI_PATTERN = re.compile(r"\[\.(?P<code>[^\[\]@\u200b]{1,32})\]")
+"""通用的 ``[.<code>]`` 形式，匹配后查 `_EMOJI_BY_CODE`，不在表中的按普通文本处理"""
+
+_VS16 = "\ufe0f"
+_EMOJI_CODE_INDEX: dict[str, str] = {}
+"""去除 VS16 的字符emoji -> 表情码，多个表情码对应同一字符时取第一个"""
+for _key, _emoji in YUNHU_EMOJI_MAP.items():
+    _EMOJI_CODE_INDEX.setdefault(_emoji.replace(_VS16, ""), _key[2:-1])
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """
+    将一组字面量构建为前缀树形式的正则表达式(不区分大小写时需配合 ``re.IGNORECASE``)
+
+    共享前缀只匹配一次，匹配耗时与词表大小无关；可选分支为贪婪匹配，优先匹配最长的词。
+    """
+    trie: dict[str, Any] = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def _pattern(node: dict[str, Any]) -> str:
+        branches = [re.escape(c) + _pattern(child) for c, child in node.items() if c]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return _pattern(trie)
+
+
+def _prefilter_class(chars: Iterable[str]) -> str:
+    """
+    生成包含所有给定字符的字符类，非 ASCII 字符按 256 个码位的区块合并为范围
+
+    零散字面量组成的字符类需要逐个比较，范围只需比较边界，用于在前缀树匹配前快速跳过
+    """
+    chars = set(chars)
+    ascii_chars = "".join(re.escape(c) for c in sorted(chars) if c.isascii())
+    ranges = "".join(
+        f"{re.escape(chr(block << 8))}-{re.escape(chr(block << 8 | 0xFF))}"
+        for block in sorted({ord(c) >> 8 for c in chars if not c.isascii()})
+    )
+    return f"[{ascii_chars}{ranges}]"
+
+
+_EMOJI_ENCODE_PATTERN = re.compile(
+    f"(?={_prefilter_class(emoji[0] for emoji in _EMOJI_CODE_INDEX)})"
+    f"(?:{build_trie_pattern({*YUNHU_EMOJI_MAP.values(), *_EMOJI_CODE_INDEX})})"
+    # 末尾可带 VS16；后接 ZWJ、肤色或键帽时属于更长的序列，不转换其中一部分
+    "\ufe0f?(?![\u200d\u20e3\U0001f3fb-\U0001f3ff])"
+)
+"""字符emoji(含/不含 VS16 的形式)的前缀树正则，最长匹配"""
+
+
+def _encode_emoji_match(match: re.Match[str]) -> str:
+    return f"[.{_EMOJI_CODE_INDEX[match[0].replace(_VS16, '')]}]\u200b"
+
+
+def encode_emoji(text: str) -> str:
+    """将文本中的字符emoji转为云湖表情 ``[.<code>]``，没有对应表情的保持原样"""
+    if text.isascii():
+        return text
+    return _EMOJI_ENCODE_PATTERN.sub(_encode_emoji_match, text)
 
 
 async def fetch_bytes(adapter: Adapter, url: str) -> bytes:
@@ -143,4 +215,11 @@ async def fetch_bytes(adapter: Adapter, url: str) -> bytes:
     raise ValueError("Response content is not bytes")
 
 
-__all__ = ["_EMOJI_KEYS", "_EMOJI_PATTERN", "fetch_bytes"]
+__all__ = [
+    "_EMOJI_BY_CODE",
+    "_EMOJI_KEYS",
+    "_EMOJI_PATTERN",
+    "build_trie_pattern",
+    "encode_emoji",
+    "fetch_bytes",
+]
@@ -0,0 +1,81 @@
+import inspect
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel
+
+from nonebot.compat import PYDANTIC_V2, TypeAdapter
+
+from .models import (
+    BoardResponse,
+    BotInfo,
+    DataDetail,
+    GroupInfo,
+    MsgInfo,
+    Reply,
+    SendMsgResponse,
+    UserInfo,
+)
+
+T = TypeVar("T")
+
+_validators: dict[Any, Callable[[Any], Any]] = {}
+"""类型 -> 编译好的校验函数"""
+
+
+def _build_validator(type_: Any) -> Callable[[Any], Any]:
+    if PYDANTIC_V2:
+        return TypeAdapter(type_).validate_python
+    if inspect.isclass(type_) and issubclass(type_, BaseModel):
+        return type_.parse_obj
+    return TypeAdapter(type_).validate_python
+
+
+def get_validator(type_: type[T]) -> Callable[[Any], T]:
+    """获取类型对应的校验函数，首次获取时构建并缓存"""
+    if (validator := _validators.get(type_)) is None:
+        validator = _validators[type_] = _build_validator(type_)
+    return validator
+
+
+def type_validate(type_: type[T], data: Any) -> T:
+    """使用缓存的校验器校验数据，替代 `nonebot.compat.type_validate_python`"""
+    return get_validator(type_)(data)
+
+
+def validate_send_msg_response(
+    data: dict[str, Any], trusted: bool = False
+) -> SendMsgResponse:
+    """
+    校验发送消息接口的返回值
+
+    :param trusted: 信任返回结构，跳过深度校验直接构造模型。
+        pydantic v2 的编译校验器比 `model_construct` 更快，因此仅在 v1 下生效
+    """
+    if not trusted or PYDANTIC_V2:
+        return type_validate(SendMsgResponse, data)
+    detail = None
+    if (raw_detail := data.get("data")) and (info := raw_detail.get("messageInfo")):
+        detail = DataDetail.construct(messageInfo=MsgInfo.construct(**info))
+    return SendMsgResponse.construct(
+        code=data.get("code"), data=detail, msg=data.get("msg", "")
+    )
+
+
+# 预先构建所有 API 响应模型的校验器
+for _type in (
+    BoardResponse,
+    BotInfo,
+    GroupInfo,
+    Reply,
+    list[Reply],
+    SendMsgResponse,
+    UserInfo,
+):
+    get_validator(_type)
+
+
+__all__ = [
+    "get_validator",
+    "type_validate",
+    "validate_send_msg_response",
+]